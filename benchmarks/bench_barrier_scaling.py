@@ -0,0 +1,268 @@
+"""Benchmark suite: barrier-certificate cost across swarm size and density.
+
+Times every factory in rps.utilities.barrier_certificates (push and QP SI
+barriers, unicycle barriers, each with and without boundary) for N in
+{2, 16, 20, 100, 500, 2000} and three densities:
+
+    sparse - robots on a jittered lattice 0.5 m apart (few close pairs)
+    flock  - Run01-style flock: a disc at ~0.2 m spacing moving together
+    convoy - jammed convoy: lanes 0.25 m apart with robots 0.12 m nose to
+             tail driving into a stopped leader (many penetrating pairs)
+
+Each case runs a short closed loop (positions advance by the barrier output
+every 33 ms step, so warm starts and neighbor lists see realistic motion) and
+records per-call wall time. Every case is run once untimed to warm up, then
+``--repeats`` rounds visit all cases in turn from the same start; a case
+reports the median of its per-round medians, and their spread (max - min)
+is kept in the JSON.
+Large swarms spill past the 3.2 m x 2 m arena, so the QP boundary barrier is
+given the swarm's extent as its boundary. ``--compare`` loads an earlier JSON
+and flags cases that got slower by more than ``--threshold`` and by more
+than both ``--noise-floor`` ms and either run's spread (exit status 1 if
+any). Run from the repo root:
+
+    python benchmarks/bench_barrier_scaling.py --output before.json
+    python benchmarks/bench_barrier_scaling.py --output after.json --compare before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from rps.utilities import barrier_certificates as bc  # noqa: E402
+
+SIZES = (2, 16, 20, 100, 500, 2000)
+DENSITIES = ("sparse", "flock", "convoy")
+TIME_STEP = 0.033
+
+ARENA = (-1.6, 1.6, -1.0, 1.0)
+
+# name -> (factory, unicycle?, takes boundary_points?)
+FACTORIES = {
+    "si": (bc.create_single_integrator_barrier_certificate, False, False),
+    "si_boundary": (bc.create_single_integrator_barrier_certificate_with_boundary, False, False),
+    "si_qp": (bc.create_single_integrator_barrier_certificate_qp, False, False),
+    "si_qp_boundary": (
+        bc.create_single_integrator_barrier_certificate_qp_with_boundary,
+        False,
+        True,
+    ),
+    "uni": (bc.create_unicycle_barrier_certificate, True, False),
+    "uni_boundary": (bc.create_unicycle_barrier_certificate_with_boundary, True, False),
+}
+
+
+def scenario(density: str, n: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """Initial 3xN poses and 2xN nominal SI velocities for one density."""
+    if density == "sparse":
+        cols = int(np.ceil(np.sqrt(n * 1.6)))
+        k = np.arange(n)
+        xy = 0.5 * np.vstack((k % cols - (cols - 1) / 2, k // cols - (n // cols) / 2))
+        xy += rng.uniform(-0.05, 0.05, (2, n))
+        dxi = rng.uniform(-0.1, 0.1, (2, n))
+    elif density == "flock":
+        radius = 0.2 * np.sqrt(n / np.pi)
+        r = radius * np.sqrt(rng.uniform(0, 1, n))
+        phi = rng.uniform(-np.pi, np.pi, n)
+        xy = np.vstack((r * np.cos(phi), r * np.sin(phi)))
+        dxi = np.array([[0.1], [0.05]]) + rng.normal(0, 0.02, (2, n))
+    elif density == "convoy":
+        lanes = max(1, int(np.sqrt(n / 8)))
+        k = np.arange(n)
+        lane, slot = k % lanes, k // lanes
+        xy = np.vstack((-0.12 * slot, 0.25 * (lane - (lanes - 1) / 2)))
+        xy[0] += 1.4
+        dxi = np.vstack((np.where(slot == 0, 0.0, 0.15), np.zeros(n)))
+    else:
+        raise ValueError(f"unknown density {density!r}")
+    theta = np.arctan2(dxi[1], dxi[0])
+    return np.vstack((xy, theta)), dxi
+
+
+def extent(poses: np.ndarray, margin: float = 0.3) -> tuple[float, float, float, float]:
+    """The Robotarium arena, grown to hold the whole swarm plus ``margin``.
+
+    Hundreds of robots at these densities do not fit in 3.2 m x 2 m; the QP
+    boundary barrier gets this box so its cubic wall terms stay meaningful.
+    """
+    low = poses[:2].min(axis=1) - margin
+    high = poses[:2].max(axis=1) + margin
+    return (
+        min(ARENA[0], low[0]),
+        max(ARENA[1], high[0]),
+        min(ARENA[2], low[1]),
+        max(ARENA[3], high[1]),
+    )
+
+
+def to_unicycle(dxi: np.ndarray, theta: np.ndarray) -> np.ndarray:
+    """Nominal [v; w] that heads each robot along its SI velocity."""
+    v = np.cos(theta) * dxi[0] + np.sin(theta) * dxi[1]
+    w = 4.0 * np.arctan2(-np.sin(theta) * dxi[0] + np.cos(theta) * dxi[1], v + 1e-9)
+    return np.vstack((v, w))
+
+
+def run_loop(name: str, density: str, n: int, steps: int, seed: int) -> np.ndarray:
+    """Per-call wall times (ms) of one closed loop from a fresh barrier."""
+    factory, unicycle, bounded = FACTORIES[name]
+    rng = np.random.default_rng(seed)
+    poses, dxi = scenario(density, n, rng)
+    barrier = factory(boundary_points=extent(poses)) if bounded else factory()
+    times = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        if unicycle:
+            dxu = barrier(to_unicycle(dxi, poses[2]), poses)
+        else:
+            u = barrier(dxi, poses[:2])
+        times.append(time.perf_counter() - start)
+        if unicycle:
+            poses[0] += TIME_STEP * dxu[0] * np.cos(poses[2])
+            poses[1] += TIME_STEP * dxu[0] * np.sin(poses[2])
+            poses[2] += TIME_STEP * dxu[1]
+        else:
+            poses[:2] += TIME_STEP * u
+    return np.asarray(times) * 1e3
+
+
+def summarise(name: str, density: str, n: int, loops: np.ndarray) -> dict:
+    """Statistics of one case from its (repeats, steps) per-call times in ms."""
+    # The first call pays for allocation and cold starts; report it apart.
+    steady = loops[:, 1:] if loops.shape[1] > 1 else loops
+    medians = np.median(steady, axis=1)
+    return {
+        "factory": name,
+        "density": density,
+        "n": n,
+        "steps": loops.shape[1],
+        "repeats": loops.shape[0],
+        "first_ms": float(np.median(loops[:, 0])),
+        "median_ms": float(np.median(medians)),
+        "spread_ms": float(medians.max() - medians.min()),
+        "repeat_medians_ms": [float(m) for m in medians],
+        "p95_ms": float(np.percentile(steady, 95)),
+        "min_ms": float(steady.min()),
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+    }
+
+
+def compare(
+    results: list[dict], baseline_path: str, threshold: float, noise_floor: float
+) -> list[dict]:
+    """Cases slower than the baseline by > ``threshold`` and beyond the noise.
+
+    A slowdown only counts once it also exceeds ``noise_floor`` ms and the
+    spread of per-repeat medians in either run.
+    """
+    baseline = json.loads(Path(baseline_path).read_text())["results"]
+    before = {(r["factory"], r["density"], r["n"]): r for r in baseline}
+    regressions = []
+    print(
+        f"\nCompared with {baseline_path} (threshold +{threshold:.0%}, "
+        f"noise floor {noise_floor:.3f} ms):"
+    )
+    for result in results:
+        old = before.get((result["factory"], result["density"], result["n"]))
+        if old is None:
+            continue
+        ratio = result["median_ms"] / max(old["median_ms"], 1e-9)
+        noise = max(noise_floor, old.get("spread_ms", 0.0), result["spread_ms"])
+        slower = result["median_ms"] - old["median_ms"]
+        flag = "REGRESSION" if ratio > 1.0 + threshold and slower > noise else ""
+        print(
+            f"{result['factory']:<15} {result['density']:<7} {result['n']:>5} "
+            f"{old['median_ms']:>10.3f} -> {result['median_ms']:>10.3f} ms {ratio:>6.2f}x "
+            f"(noise {noise:.3f}) {flag}"
+        )
+        if flag:
+            regressions.append(result | {"baseline_ms": old["median_ms"], "ratio": ratio})
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--factories", nargs="+", choices=FACTORIES, default=list(FACTORIES))
+    parser.add_argument("--densities", nargs="+", choices=DENSITIES, default=list(DENSITIES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    parser.add_argument("--steps", type=int, default=20, help="loop steps per case (N <= 100)")
+    parser.add_argument("--large-steps", type=int, default=5, help="loop steps per case (N > 100)")
+    parser.add_argument("--repeats", type=int, default=5, help="timed rounds over all cases")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results JSON here (default: stdout only)")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown fraction")
+    parser.add_argument(
+        "--noise-floor", type=float, default=0.05, help="ignore slowdowns below this many ms"
+    )
+    args = parser.parse_args()
+
+    cases = [
+        (name, density, n, args.steps if n <= 100 else args.large_steps)
+        for name in args.factories
+        for density in args.densities
+        for n in args.sizes
+    ]
+    # Round 0 warms up every case; the timed rounds then visit the cases in
+    # turn, so drift of the machine's speed shows up in each case's spread.
+    loops = {case: [] for case in cases}
+    for round_ in range(args.repeats + 1):
+        for case in cases:
+            times = run_loop(*case, args.seed)
+            if round_:
+                loops[case].append(times)
+
+    results = []
+    print(
+        f"{'factory':<15} {'density':<7} {'N':>5} {'first ms':>10} {'median ms':>10} "
+        f"{'spread ms':>10} {'p95 ms':>10}"
+    )
+    for case in cases:
+        result = summarise(*case[:3], np.array(loops[case]))
+        results.append(result)
+        print(
+            f"{result['factory']:<15} {result['density']:<7} {result['n']:>5} "
+            f"{result['first_ms']:>10.3f} {result['median_ms']:>10.3f} "
+            f"{result['spread_ms']:>10.3f} {result['p95_ms']:>10.3f}"
+        )
+
+    report = {"environment": environment(), "results": results}
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nWrote {len(results)} cases to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold, args.noise_floor)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than the baseline by > {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
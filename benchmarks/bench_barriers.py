@@ -0,0 +1,115 @@
+"""Benchmark: vectorized SI barrier certificates vs the original pair loop.
+
+For N from 2 to 2000 robots scattered at Run-script density, times one call
+of each SI barrier factory with the all-pairs ("dense") and spatial-hash
+("grid") neighbor search and of the original nested-loop implementation
+(kept below as the reference), and checks the outputs agree within 1e-12.
+The reference loop is O(N^2) Python, so it is skipped above ``--loop-max``.
+Run from the repo root:
+
+    python benchmarks/bench_barriers.py [--loop-max 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from rps.utilities import barrier_certificates as bc  # noqa: E402
+
+SIZES = (2, 16, 20, 100, 500, 2000)
+
+
+def reference_si_barrier(dxi, x, safety_radius, magnitude_limit=None, boundary_margin=None):
+    """The original per-pair loop from rps.utilities.barrier_certificates."""
+    safe = np.array(dxi, dtype=float, copy=True)
+    n = x.shape[1]
+    for i in range(n):
+        for j in range(i + 1, n):
+            diff = x[:2, i] - x[:2, j]
+            dist = np.linalg.norm(diff)
+            if dist < safety_radius and dist > 1e-6:
+                push = (safety_radius - dist) * (diff / dist)
+                safe[:, i] += 0.3 * push
+                safe[:, j] -= 0.3 * push
+        if boundary_margin is not None:
+            if x[0, i] < -1.6 + boundary_margin:
+                safe[0, i] = abs(safe[0, i])
+            if x[0, i] > 1.6 - boundary_margin:
+                safe[0, i] = -abs(safe[0, i])
+            if x[1, i] < -1.0 + boundary_margin:
+                safe[1, i] = abs(safe[1, i])
+            if x[1, i] > 1.0 - boundary_margin:
+                safe[1, i] = -abs(safe[1, i])
+    if magnitude_limit is not None:
+        mag = np.linalg.norm(safe, axis=0)
+        over = mag > magnitude_limit
+        if np.any(over):
+            safe[:, over] *= magnitude_limit / mag[over]
+    return safe
+
+
+def scatter(n: int, rng: np.random.Generator, spacing: float = 0.2) -> np.ndarray:
+    """Random 3xN poses with mean nearest-neighbour spacing around ``spacing``."""
+    side = spacing * np.sqrt(n)
+    xy = rng.uniform(-side / 2, side / 2, (2, n))
+    return np.vstack((xy, rng.uniform(-np.pi, np.pi, n)))
+
+
+def best_of(fn, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--loop-max", type=int, default=500, help="largest N for the loop")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    radius = 0.2
+    factories = {
+        "si": (bc.create_single_integrator_barrier_certificate, {"magnitude_limit": 0.2}),
+        "si_boundary": (
+            bc.create_single_integrator_barrier_certificate_with_boundary,
+            {"boundary_margin": 0.05},
+        ),
+    }
+    header = ("factory", "N", "loop ms", "dense ms", "grid ms", "speedup", "max err")
+    print("{:<12} {:>5} {:>10} {:>10} {:>10} {:>8} {:>9}".format(*header))
+    for name, (factory, options) in factories.items():
+        dense = factory(safety_radius=radius, neighbor_search="dense", **options)
+        grid = factory(safety_radius=radius, neighbor_search="grid", **options)
+        for n in SIZES:
+            x = scatter(n, rng)
+            dxi = rng.uniform(-0.15, 0.15, (2, n))
+            repeats = 20 if n <= 100 else 3
+            assert np.array_equal(grid(dxi, x), dense(dxi, x)), f"{name} N={n} grid differs"
+            dense_time = best_of(lambda: dense(dxi, x), repeats)
+            grid_time = best_of(lambda: grid(dxi, x), repeats)
+            best = min(dense_time, grid_time)
+            timings = f"{dense_time * 1e3:>10.3f} {grid_time * 1e3:>10.3f}"
+            if n <= args.loop_max:
+                expected = reference_si_barrier(dxi, x, radius, **options)
+                error = np.abs(dense(dxi, x) - expected).max()
+                loop = best_of(lambda: reference_si_barrier(dxi, x, radius, **options), 1)
+                print(
+                    f"{name:<12} {n:>5} {loop * 1e3:>10.3f} {timings} {loop / best:>7.1f}x"
+                    f" {error:>9.1e}"
+                )
+                assert error <= 1e-12, f"{name} N={n} deviates by {error:.2e}"
+            else:
+                print(f"{name:<12} {n:>5} {'-':>10} {timings} {'-':>8} {'-':>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Microbenchmark: per-iteration cost of reading poses from the Robotarium.
+
+Compares the three pose-read paths a control loop can use:
+    copy  - ``r.get_poses()`` (allocates a fresh 3xN array every call)
+    out=  - ``r.get_poses(out=buf)`` (copies into one caller-owned buffer)
+    view  - ``r.get_poses_view()`` (read-only view, no copy at all)
+
+Reports mean time per call and bytes allocated per call (tracemalloc) at
+N=20 and N=1000. Run from the repo root:
+
+    python benchmarks/bench_get_poses.py
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from rps.robotarium import Robotarium  # noqa: E402
+
+CALLS = 20000
+
+
+def _measure(read) -> tuple[float, float]:
+    """Return (microseconds per call, peak bytes allocated by one call)."""
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        read()
+    micros = (time.perf_counter() - start) / CALLS * 1e6
+
+    tracemalloc.start()
+    read()  # warm up any lazily created objects
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    read()
+    peak = tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+    return micros, max(peak, 0)
+
+
+def main() -> None:
+    print(f"{'N':>6} {'path':>6} {'us/call':>9} {'bytes/call':>11}")
+    for n in (20, 1000):
+        r = Robotarium(n, initial_conditions=np.zeros((3, n)))
+        buf = np.empty((3, n))
+        paths = {
+            "copy": r.get_poses,
+            "out=": lambda r=r, buf=buf: r.get_poses(out=buf),
+            "view": r.get_poses_view,
+        }
+        for name, read in paths.items():
+            micros, nbytes = _measure(read)
+            print(f"{n:>6} {name:>6} {micros:>9.3f} {nbytes:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
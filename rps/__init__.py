@@ -2,6 +2,7 @@
 
 Full API parity with robotarium_python_simulator including:
 - Robotarium class (unicycle kinematics, velocity limits, frame history)
+- BatchRobotarium ensemble (B independent replicas stepped in one call)
 - SI and unicycle controllers (position, pose, CLF-based)
 - Barrier certificates (SI/unicycle, with/without boundary)
 - Dynamics transformations (SI <-> unicycle)
@@ -9,6 +10,6 @@ Full API parity with robotarium_python_simulator including:
 - Convergence helpers (at_pose, at_position)
 """
 
-from .robotarium import Robotarium
+from .robotarium import BatchRobotarium, Robotarium
 
-__all__ = ["Robotarium"]
+__all__ = ["BatchRobotarium", "Robotarium"]
@@ -0,0 +1,299 @@
+"""Trajectory history backends for the Robotarium simulator.
+
+Every backend exposes the same small surface used by ``Robotarium``:
+``append(frame)`` copies one pose frame in, ``len()`` counts stored frames,
+indexing/iteration return frames oldest-first and ``as_array()`` returns a
+(T, *frame_shape) array. Backends differ only in how much they keep:
+
+    list    - unbounded list of per-frame copies (legacy default)
+    buffer  - contiguous preallocated (T, *frame_shape) array, no per-step allocation
+    ring    - the last K frames in a preallocated circular buffer
+    memmap  - frames streamed into an on-disk ``.npy`` memory map
+    off     - nothing is stored
+
+Memory-mapped runs write ``<name>.npy`` (frames) plus a ``<name>.json``
+sidecar holding the run metadata (N, dt, seed, script name, frame count);
+``load_history`` opens both lazily so frames can be sliced without reading
+the whole file. The sidecar exists because the ``.npy`` header only admits
+``descr``/``fortran_order``/``shape``.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+HISTORY_BACKENDS = ("list", "buffer", "ring", "memmap", "off")
+
+
+class ListHistory(list):
+    """Unbounded list of frame copies (the original ``Robotarium.history``)."""
+
+    def __init__(self, dtype=np.float64) -> None:
+        super().__init__()
+        self.dtype = np.dtype(dtype)
+
+    def append(self, frame: np.ndarray) -> None:
+        super().append(np.array(frame, dtype=self.dtype, copy=True))
+
+    def extend(self, frames: np.ndarray) -> None:
+        for frame in frames:
+            self.append(frame)
+
+    def as_array(self) -> np.ndarray:
+        """Return all frames stacked into one (T, ...) array."""
+        return np.stack(self) if len(self) else np.empty((0,), dtype=self.dtype)
+
+    def cursor(self) -> int:
+        """Opaque position token for ``rewind`` (the frame count)."""
+        return len(self)
+
+    def rewind(self, cursor: int) -> None:
+        """Drop frames recorded after ``cursor`` was taken."""
+        if cursor > len(self):
+            raise ValueError("cannot rewind history to frames it no longer holds")
+        del self[cursor:]
+
+
+class _ArrayHistory:
+    """Shared read API for backends that store frames in one ndarray."""
+
+    _data: np.ndarray
+
+    def __len__(self) -> int:
+        return self._count
+
+    def extend(self, frames: np.ndarray) -> None:
+        for frame in frames:
+            self.append(frame)
+
+    def cursor(self):
+        """Opaque position token for ``rewind`` (the frame count)."""
+        return self._count
+
+    def rewind(self, cursor) -> None:
+        """Drop frames recorded after ``cursor`` was taken."""
+        if cursor > self._count:
+            raise ValueError("cannot rewind history to frames it no longer holds")
+        self._count = cursor
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def __getitem__(self, index):
+        return self.as_array()[index]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._data.dtype
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of frames held at once."""
+        return self._data.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes reserved for frame storage."""
+        return self._data.nbytes
+
+
+class BufferHistory(_ArrayHistory):
+    """Contiguous preallocated (T, *frame_shape) frame buffer.
+
+    Frames are written in place, so recording allocates nothing per step.
+    Appending past ``length`` frames raises ``IndexError`` rather than growing.
+    """
+
+    def __init__(self, frame_shape: tuple[int, ...], length: int, dtype=np.float64) -> None:
+        if length < 1:
+            raise ValueError("history_length must be >= 1")
+        self._data = np.empty((int(length),) + tuple(frame_shape), dtype=dtype)
+        self._count = 0
+
+    def append(self, frame: np.ndarray) -> None:
+        if self._count >= self._data.shape[0]:
+            raise IndexError(
+                f"history buffer full ({self._data.shape[0]} frames); "
+                "raise history_length or use history='ring'"
+            )
+        self._data[self._count] = frame
+        self._count += 1
+
+    def extend(self, frames: np.ndarray) -> None:
+        end = self._count + len(frames)
+        if end > self._data.shape[0]:
+            raise IndexError(
+                f"history buffer full ({self._data.shape[0]} frames); "
+                "raise history_length or use history='ring'"
+            )
+        self._data[self._count : end] = frames
+        self._count = end
+
+    def as_array(self) -> np.ndarray:
+        """Return a view of the recorded frames (no copy)."""
+        return self._data[: self._count]
+
+
+class RingHistory(_ArrayHistory):
+    """Circular buffer keeping only the most recent ``length`` frames."""
+
+    def __init__(self, frame_shape: tuple[int, ...], length: int, dtype=np.float64) -> None:
+        if length < 1:
+            raise ValueError("history_length must be >= 1")
+        self._data = np.empty((int(length),) + tuple(frame_shape), dtype=dtype)
+        self._count = 0
+        self._head = 0  # slot the next frame is written to
+        self.total_frames = 0  # frames ever appended, including overwritten ones
+
+    def append(self, frame: np.ndarray) -> None:
+        self._data[self._head] = frame
+        self._head = (self._head + 1) % self._data.shape[0]
+        self._count = min(self._count + 1, self._data.shape[0])
+        self.total_frames += 1
+
+    def cursor(self):
+        """Position token; carries the (bounded) ring contents."""
+        return self._data.copy(), self._count, self._head, self.total_frames
+
+    def rewind(self, cursor) -> None:
+        """Restore the ring exactly as it was when ``cursor`` was taken."""
+        data, self._count, self._head, self.total_frames = cursor
+        self._data[...] = data
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if not -self._count <= index < self._count:
+                raise IndexError("history index out of range")
+            start = self._head - self._count
+            return self._data[(start + index % self._count) % self._data.shape[0]]
+        return self.as_array()[index]
+
+    def as_array(self) -> np.ndarray:
+        """Return the retained frames oldest-first (a copy once wrapped)."""
+        if self._count < self._data.shape[0]:
+            return self._data[: self._count]
+        return np.roll(self._data, -self._head, axis=0)
+
+
+class MemmapHistory(BufferHistory):
+    """Frame buffer backed by a memory-mapped ``.npy`` file on disk.
+
+    Frames go straight to the OS page cache, so resident memory stays flat no
+    matter how long the run is. ``close()`` flushes the map and rewrites the
+    sidecar with the final frame count; until then the sidecar reports the
+    capacity and ``frames`` is ``null``.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        frame_shape: tuple[int, ...],
+        length: int,
+        dtype=np.float64,
+        metadata: dict | None = None,
+    ) -> None:
+        if length < 1:
+            raise ValueError("history_length must be >= 1")
+        self.path = Path(path)
+        self.metadata_path = self.path.with_suffix(".json")
+        self._data = np.lib.format.open_memmap(
+            self.path, mode="w+", dtype=dtype, shape=(int(length),) + tuple(frame_shape)
+        )
+        self._count = 0
+        self.metadata = dict(metadata or {})
+        self.metadata.update(
+            frame_shape=list(frame_shape),
+            dtype=np.dtype(dtype).str,
+            capacity=int(length),
+            frames=None,
+        )
+        self._write_metadata()
+
+    def _write_metadata(self) -> None:
+        self.metadata_path.write_text(json.dumps(self.metadata, indent=2) + "\n")
+
+    def flush(self) -> None:
+        """Flush written frames to disk."""
+        self._data.flush()
+
+    def __deepcopy__(self, memo):
+        raise TypeError(
+            "a memory-mapped history cannot be copied; pass history= to fork() "
+            "to give each replica its own backend"
+        )
+
+    def close(self) -> None:
+        """Flush frames and record the final frame count in the sidecar."""
+        self.flush()
+        self.metadata["frames"] = self._count
+        self._write_metadata()
+
+
+def load_history(path: str | Path, mmap_mode: str = "r") -> tuple[np.ndarray, dict]:
+    """Open a memory-mapped run lazily.
+
+    Returns ``(frames, metadata)`` where ``frames`` is a (T, *frame_shape)
+    memory map trimmed to the recorded frame count; slicing it reads only the
+    touched pages.
+    """
+    path = Path(path)
+    frames = np.load(path, mmap_mode=mmap_mode)
+    metadata_path = path.with_suffix(".json")
+    metadata = json.loads(metadata_path.read_text()) if metadata_path.exists() else {}
+    count = metadata.get("frames")
+    if count is not None:
+        frames = frames[:count]
+    return frames, metadata
+
+
+class NullHistory(_ArrayHistory):
+    """Backend that discards every frame (history recording off)."""
+
+    def __init__(self, frame_shape: tuple[int, ...], dtype=np.float64) -> None:
+        self._data = np.empty((0,) + tuple(frame_shape), dtype=dtype)
+        self._count = 0
+
+    def append(self, frame: np.ndarray) -> None:
+        return
+
+    def extend(self, frames: np.ndarray) -> None:
+        return
+
+    def rewind(self, cursor) -> None:
+        return
+
+    def as_array(self) -> np.ndarray:
+        return self._data
+
+
+def create_history(
+    backend: str,
+    frame_shape: tuple[int, ...],
+    length: int | None = None,
+    dtype=np.float64,
+    path: str | Path | None = None,
+    metadata: dict | None = None,
+):
+    """Build a history backend by name (see module docstring).
+
+    ``length`` is the frame capacity and is required for ``buffer``, ``ring``
+    and ``memmap``; ``memmap`` also needs ``path`` and stores ``metadata``.
+    """
+    if backend == "list":
+        return ListHistory(dtype=dtype)
+    if backend == "off":
+        return NullHistory(frame_shape, dtype=dtype)
+    if backend in ("buffer", "ring"):
+        if length is None:
+            raise ValueError(f"history='{backend}' requires history_length")
+        cls = BufferHistory if backend == "buffer" else RingHistory
+        return cls(frame_shape, length, dtype=dtype)
+    if backend == "memmap":
+        if length is None or path is None:
+            raise ValueError("history='memmap' requires history_length and history_path")
+        return MemmapHistory(path, frame_shape, length, dtype=dtype, metadata=metadata)
+    raise ValueError(f"history must be one of {HISTORY_BACKENDS}, got {backend!r}")
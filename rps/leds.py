@@ -0,0 +1,157 @@
+"""Compact change-only recorder for GRITSBot LED commands.
+
+Frames line up with the pose history: frame 0 holds the colours commanded
+before the first ``step()``, frame t those in effect while step t + 1 runs.
+Each frame is logically a (2, 3, N) uint8 array (left/right side, RGB,
+robot) with any ensemble axes in front.
+
+Storage is an append-only change log: a ``set`` call only writes the robots
+whose quantised colour differs from their current one, so a script pushing an
+unchanged 3xN colour matrix every iteration records nothing. A full keyframe
+is kept every ``keyframe_interval`` frames so any frame is rebuilt from the
+nearest keyframe plus at most one interval of changes.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+LEFT = 0
+RIGHT = 1
+
+
+class LedRecorder:
+    """Change-only uint8 LED store with keyframed random access."""
+
+    def __init__(
+        self,
+        number_of_robots: int,
+        leading_shape: tuple[int, ...] = (),
+        keyframe_interval: int = 256,
+    ) -> None:
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be >= 1")
+        self.number_of_robots = int(number_of_robots)
+        self.leading_shape = tuple(leading_shape)
+        self.keyframe_interval = int(keyframe_interval)
+        self._replicas = int(np.prod(self.leading_shape, dtype=int))
+        # One RGB slot per (replica, side, robot), flattened in that order.
+        self._state = np.zeros((self._replicas * 2 * self.number_of_robots, 3), dtype=np.uint8)
+        self._keyframes = [self._state.copy()]
+        self.frame = 0
+
+        self._log_frame = np.empty(64, dtype=np.int32)
+        self._log_slot = np.empty(64, dtype=np.int32)
+        self._log_rgb = np.empty((64, 3), dtype=np.uint8)
+        self._log_len = 0
+
+    # ── writing ─────────────────────────────────────────────────────────
+
+    def set(self, side: int, ids: np.ndarray, colors: np.ndarray) -> int:
+        """Record ``colors`` (3 x len(ids), 0-255) on one LED side.
+
+        ``colors`` may carry the ensemble axes in front (B x 3 x len(ids)) or
+        be broadcast to every replica. Returns the number of robot slots whose
+        colour changed (and were therefore written).
+        """
+        ids = np.asarray(ids, dtype=int).reshape(-1)
+        colors = np.asarray(colors, dtype=float)
+        if colors.shape[-2:] != (3, ids.size) or colors.shape[:-2] not in ((), self.leading_shape):
+            raise ValueError("colors must be shape (3, len(ids))")
+        rgb = np.clip(np.rint(colors), 0, 255).astype(np.uint8)
+        rgb = np.broadcast_to(rgb, self.leading_shape + (3, ids.size))
+        rgb = np.moveaxis(rgb, -2, -1).reshape(-1, 3)
+
+        replica = np.arange(self._replicas)[:, None]
+        slots = ((replica * 2 + side) * self.number_of_robots + ids).reshape(-1)
+        changed = np.any(self._state[slots] != rgb, axis=1)
+        count = int(np.count_nonzero(changed))
+        if count:
+            slots = slots[changed]
+            rgb = rgb[changed]
+            self._state[slots] = rgb
+            self._append_log(slots, rgb)
+        return count
+
+    def _append_log(self, slots: np.ndarray, rgb: np.ndarray) -> None:
+        end = self._log_len + slots.size
+        if end > self._log_slot.size:
+            capacity = max(end, 2 * self._log_slot.size)
+            self._log_frame = np.resize(self._log_frame, capacity)
+            self._log_slot = np.resize(self._log_slot, capacity)
+            self._log_rgb = np.resize(self._log_rgb, (capacity, 3))
+        self._log_frame[self._log_len : end] = self.frame
+        self._log_slot[self._log_len : end] = slots
+        self._log_rgb[self._log_len : end] = rgb
+        self._log_len = end
+
+    def advance(self, frames: int = 1) -> None:
+        """Move to the next frame(s), carrying the current colours forward."""
+        end = self.frame + int(frames)
+        crossed = end // self.keyframe_interval - self.frame // self.keyframe_interval
+        self._keyframes.extend(self._state.copy() for _ in range(crossed))
+        self.frame = end
+
+    def snapshot(self) -> tuple:
+        """Position token for ``restore`` (current colours and log cursor)."""
+        return self._state.copy(), self.frame, self._log_len, len(self._keyframes)
+
+    def restore(self, snapshot: tuple) -> None:
+        """Rewind to ``snapshot``, discarding changes recorded after it."""
+        state, self.frame, self._log_len, keyframes = snapshot
+        self._state[...] = state
+        del self._keyframes[keyframes:]
+
+    # ── reading ─────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return self.frame + 1
+
+    @property
+    def changes(self) -> int:
+        """Number of (robot, side) colour changes stored in the log."""
+        return self._log_len
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the change log and keyframes."""
+        log = self._log_len * (2 * np.dtype(np.int32).itemsize + 3)
+        return log + sum(k.nbytes for k in self._keyframes)
+
+    def _to_frame(self, state: np.ndarray) -> np.ndarray:
+        frame = state.reshape(self.leading_shape + (2, self.number_of_robots, 3))
+        return np.ascontiguousarray(np.moveaxis(frame, -1, -2))
+
+    def current(self) -> np.ndarray:
+        """Colours in effect now as a (..., 2, 3, N) uint8 array."""
+        return self._to_frame(self._state)
+
+    def frame_at(self, t: int) -> np.ndarray:
+        """Rebuild frame ``t`` (negative indices count from the end)."""
+        if t < 0:
+            t += len(self)
+        if not 0 <= t < len(self):
+            raise IndexError("LED frame index out of range")
+        key = t // self.keyframe_interval
+        state = self._keyframes[key].copy()
+        frames = self._log_frame[: self._log_len]
+        lo = np.searchsorted(frames, key * self.keyframe_interval, side="left")
+        hi = np.searchsorted(frames, t, side="right")
+        state[self._log_slot[lo:hi]] = self._log_rgb[lo:hi]
+        return self._to_frame(state)
+
+    def __getitem__(self, t: int) -> np.ndarray:
+        return self.frame_at(t)
+
+    def as_array(self) -> np.ndarray:
+        """Materialise every frame as a (T, ..., 2, 3, N) uint8 array."""
+        out = np.empty((len(self),) + self._state.shape, dtype=np.uint8)
+        state = self._keyframes[0].copy()
+        frames = self._log_frame[: self._log_len]
+        bounds = np.searchsorted(frames, np.arange(len(self) + 1), side="left")
+        for t in range(len(self)):
+            lo, hi = bounds[t], bounds[t + 1]
+            state[self._log_slot[lo:hi]] = self._log_rgb[lo:hi]
+            out[t] = state
+        out = out.reshape((len(self),) + self.leading_shape + (2, self.number_of_robots, 3))
+        return np.ascontiguousarray(np.moveaxis(out, -1, -2))
@@ -1,7 +1,27 @@
 from __future__ import annotations
 
+import copy
+import itertools
+import os
+import random
+import sys
+
 import numpy as np
 
+from .history import create_history
+from .integrators import (
+    INTEGRATORS,
+    integrate_unicycle,
+    reference_substeps,
+    unicycle_arc_trajectory,
+    wrap_heading,
+)
+from .leds import LEFT, RIGHT, LedRecorder
+from .timing import LoopTimer, RealTimePacer
+
+# Branch ids are global so snapshots never match a branch of another replica.
+_BRANCH_IDS = itertools.count()
+
 
 class Robotarium:
     """Robotarium-compatible simulator with full feature parity.
@@ -11,6 +31,9 @@ class Robotarium:
 
     Arena: [-1.6, 1.6] x [-1.0, 1.0] metres (standard Robotarium bounds).
     Kinematics: unicycle model  dx = v*cos(th), dy = v*sin(th), dth = w.
+
+    Constructor options (history, integration, real-time pacing, loop
+    timing) and the LED and checkpoint APIs are described in docs/simulator.md.
     """
 
     # ── GRITSBot hardware velocity limits ───────────────────────────────
@@ -28,81 +51,380 @@ class Robotarium:
         initial_conditions: np.ndarray | None = None,
         sim_in_real_time: bool = False,
         time_step: float = 0.033,
+        history: str = "list",
+        history_length: int | None = None,
+        history_every: int = 1,
+        history_dtype=np.float64,
+        history_path: str | None = None,
+        seed: int | None = None,
+        script_name: str | None = None,
+        integrator: str = "euler",
+        substeps: int = 1,
+        track_integration_error: bool = False,
+        real_time_speed: float | None = 1.0,
+        time_loop: bool = True,
     ) -> None:
         self.number_of_robots = int(number_of_robots)
         self.show_figure = bool(show_figure)
         self.sim_in_real_time = bool(sim_in_real_time)
         self.time_step = float(time_step)
 
-        if initial_conditions is None:
-            self.poses = np.zeros((3, self.number_of_robots))
-        else:
-            self.poses = np.array(initial_conditions, dtype=float, copy=True)
-            if self.poses.shape != (3, self.number_of_robots):
-                raise ValueError("initial_conditions must be shape (3, N)")
+        self.poses = self._initial_poses(initial_conditions)
+        # Integration only ever writes into self.poses, so one view stays valid.
+        self._poses_view = self.poses.view()
+        self._poses_view.flags.writeable = False
+        # RNG state a fork() replica installs the first time it is used.
+        self._pending_rng: dict | None = None
+
+        self._dxu = np.zeros(self._leading_shape + (2, self.number_of_robots))
+        self.velocities = np.zeros(self._leading_shape + (2, self.number_of_robots))
+        if int(history_every) < 1:
+            raise ValueError("history_every must be >= 1")
+        self.history_every = int(history_every)
+        self.seed = seed
+        self.script_name = script_name or os.path.basename(sys.argv[0])
+        self.history = create_history(
+            history,
+            self.poses.shape,
+            length=history_length,
+            dtype=history_dtype,
+            path=history_path,
+            metadata={
+                "number_of_robots": self.number_of_robots,
+                "time_step": self.time_step,
+                "history_every": self.history_every,
+                "seed": seed,
+                "script_name": self.script_name,
+            },
+        )
+        self.history.append(self.poses)
+        self._steps = 0
+        # Timeline as (branch id, first step) segments; restore() starts a branch.
+        self._branches = [(next(_BRANCH_IDS), 0)]
+
+        if integrator not in INTEGRATORS:
+            raise ValueError(f"integrator must be one of {INTEGRATORS}, got {integrator!r}")
+        if int(substeps) < 1:
+            raise ValueError("substeps must be >= 1")
+        self.integrator = integrator
+        self.substeps = int(substeps)
+        self._reference_substeps = reference_substeps(self.time_step)
+        self._track_integration_error = bool(track_integration_error)
+        self._integration_error_max = 0.0
+        self._integration_error_sum = 0.0
+        self._integration_error_count = 0
+
+        self.pacer = None
+        if self.sim_in_real_time:
+            if os.environ.get("RNPS_FAST_SIM", "0") == "1":
+                real_time_speed = None
+            self.pacer = RealTimePacer(self.time_step, speed=real_time_speed)
+        self.loop_timer = LoopTimer(self.time_step) if time_loop else None
+
+        self.leds = LedRecorder(self.number_of_robots, self._leading_shape)
+
+    @property
+    def _leading_shape(self) -> tuple[int, ...]:
+        """Shape of the axes in front of every (3, N) / (2, N) state array."""
+        return ()
 
-        self._dxu = np.zeros((2, self.number_of_robots))
-        self.velocities = np.zeros((2, self.number_of_robots))
-        self.history: list[np.ndarray] = [self.poses.copy()]
-        self._left_led_commands: list[list[int]] = []
-        self._right_led_commands: list[list[int]] = []
+    def _initial_poses(self, initial_conditions: np.ndarray | None) -> np.ndarray:
+        if initial_conditions is None:
+            return np.zeros((3, self.number_of_robots))
+        poses = np.array(initial_conditions, dtype=float, copy=True)
+        if poses.shape != (3, self.number_of_robots):
+            raise ValueError("initial_conditions must be shape (3, N)")
+        return poses
 
     # ── pose access ─────────────────────────────────────────────────────
 
-    def get_poses(self) -> np.ndarray:
-        """Return current 3xN pose matrix [x; y; theta]."""
-        return self.poses.copy()
+    def get_poses(self, out: np.ndarray | None = None) -> np.ndarray:
+        """Return current 3xN pose matrix [x; y; theta].
+
+        With ``out`` the poses are copied into that caller-owned buffer, which
+        is returned, so a control loop can reuse one array every iteration.
+        """
+        self._resume_rng()
+        if out is None:
+            return self.poses.copy()
+        out[...] = self.poses
+        return out
+
+    def get_poses_view(self) -> np.ndarray:
+        """Return a read-only view of the live pose matrix (no copy).
+
+        The view tracks the simulator: it changes in place on every ``step()``,
+        so copy anything that must survive the next step.
+        """
+        self._resume_rng()
+        return self._poses_view
 
     # ── velocity commands ───────────────────────────────────────────────
 
     def set_velocities(self, ids: np.ndarray, dxu: np.ndarray) -> None:
         """Set unicycle velocities [v; w] for the given robot indices."""
+        self._resume_rng()
         ids = np.asarray(ids, dtype=int)
         dxu = np.asarray(dxu, dtype=float)
-        if dxu.shape != (2, ids.size):
+        if dxu.shape[-2:] != (2, ids.size) or dxu.shape[:-2] not in ((), self._leading_shape):
             raise ValueError("dxu must be shape (2, len(ids))")
 
         # Enforce hardware velocity limits (matches real GRITSBot)
-        dxu[0, :] = np.clip(dxu[0, :], -self.MAX_LINEAR_VELOCITY, self.MAX_LINEAR_VELOCITY)
-        dxu[1, :] = np.clip(dxu[1, :], -self.MAX_ANGULAR_VELOCITY, self.MAX_ANGULAR_VELOCITY)
+        dxu[..., 0, :] = np.clip(
+            dxu[..., 0, :], -self.MAX_LINEAR_VELOCITY, self.MAX_LINEAR_VELOCITY
+        )
+        dxu[..., 1, :] = np.clip(
+            dxu[..., 1, :], -self.MAX_ANGULAR_VELOCITY, self.MAX_ANGULAR_VELOCITY
+        )
 
-        self._dxu[:, ids] = dxu
-        self.velocities[:, ids] = dxu
+        self._dxu[..., ids] = dxu
+        self.velocities[..., ids] = dxu
 
     # ── integration step ────────────────────────────────────────────────
 
     def step(self) -> None:
         """Advance simulation by one time step using unicycle kinematics."""
-        theta = self.poses[2, :]
-        v = self._dxu[0, :]
-        w = self._dxu[1, :]
+        self._resume_rng()
+        if self.loop_timer is not None:
+            self.loop_timer.start_step()
+
+        if self._track_integration_error:
+            reference = self.poses.copy()
+            integrate_unicycle(
+                reference, self._dxu, self.time_step, "euler", self._reference_substeps
+            )
+
+        integrate_unicycle(self.poses, self._dxu, self.time_step, self.integrator, self.substeps)
 
-        # Unicycle integration
-        self.poses[0, :] += self.time_step * v * np.cos(theta)
-        self.poses[1, :] += self.time_step * v * np.sin(theta)
-        self.poses[2, :] += self.time_step * w
+        if self._track_integration_error:
+            error = np.hypot(
+                self.poses[..., 0, :] - reference[..., 0, :],
+                self.poses[..., 1, :] - reference[..., 1, :],
+            )
+            self._integration_error_max = max(self._integration_error_max, float(error.max()))
+            self._integration_error_sum += float(error.sum())
+            self._integration_error_count += error.size
 
         # Normalise heading to [-pi, pi]
-        self.poses[2, :] = (self.poses[2, :] + np.pi) % (2 * np.pi) - np.pi
+        self.poses[..., 2, :] = wrap_heading(self.poses[..., 2, :])
 
         # Arena boundary enforcement
-        self.poses[0, :] = np.clip(self.poses[0, :], -self.BOUNDARY_X, self.BOUNDARY_X)
-        self.poses[1, :] = np.clip(self.poses[1, :], -self.BOUNDARY_Y, self.BOUNDARY_Y)
+        self.poses[..., 0, :] = np.clip(self.poses[..., 0, :], -self.BOUNDARY_X, self.BOUNDARY_X)
+        self.poses[..., 1, :] = np.clip(self.poses[..., 1, :], -self.BOUNDARY_Y, self.BOUNDARY_Y)
+
+        self._steps += 1
+        if self._steps % self.history_every == 0:
+            self.history.append(self.poses)
+        self.leds.advance()
+        self._end_step(1)
+
+    def _end_step(self, steps: int) -> None:
+        if self.loop_timer is not None:
+            self.loop_timer.end_step()
+        if self.pacer is not None:
+            self.pacer.wait(steps)
+            if self.loop_timer is not None:
+                self.loop_timer.resume()
+
+    def integration_error(self) -> dict:
+        """Position error of the configured integrator against 30 Hz Euler.
+
+        Errors are per step (both integrate from the same pre-step pose) and
+        only accumulate when ``track_integration_error=True``.
+        """
+        count = self._integration_error_count
+        return {
+            "integrator": self.integrator,
+            "substeps": self.substeps,
+            "time_step": self.time_step,
+            "reference_substeps": self._reference_substeps,
+            "steps": self._steps,
+            "max_position_error": self._integration_error_max,
+            "mean_position_error": self._integration_error_sum / count if count else 0.0,
+        }
+
+    def step_many(self, k: int) -> None:
+        """Advance k steps under the currently held [v; w] commands.
 
-        self.history.append(self.poses.copy())
+        Integrates the unicycle arc in closed form for all k steps in one
+        vectorized call instead of k Euler updates, so dwell and standby
+        phases cost one call. The arena clamp is applied after every step and
+        history records exactly the frames k calls to ``step()`` would.
+        Poses agree with repeated ``step()`` calls to the Euler truncation
+        error (zero for stationary or straight-line commands up to rounding).
+        """
+        self._resume_rng()
+        k = int(k)
+        if k <= 0:
+            return
+        if self.loop_timer is not None:
+            self.loop_timer.start_step()
+        frames = unicycle_arc_trajectory(
+            self.poses, self._dxu, self.time_step, k, bounds=(self.BOUNDARY_X, self.BOUNDARY_Y)
+        )
+        self.poses[...] = frames[-1]
 
-    # ── LED stubs (API compatibility) ───────────────────────────────────
+        # Frame j is step self._steps + j + 1; keep those on the decimation grid.
+        first = self._steps + 1
+        offset = (-first) % self.history_every
+        self.history.extend(frames[offset :: self.history_every])
+        self._steps += k
+        self.leds.advance(k)
+        self._end_step(k)
+
+    # ── LED commands ────────────────────────────────────────────────────
 
     def set_left_leds(self, ids: np.ndarray, colors: np.ndarray) -> None:
-        """Stub for GRITSBot left LED commands (recorded for web playback)."""
-        return
+        """Record GRITSBot left LED colours (3 x len(ids), 0-255) in ``self.leds``."""
+        self.leds.set(LEFT, ids, colors)
 
     def set_right_leds(self, ids: np.ndarray, colors: np.ndarray) -> None:
-        """Stub for GRITSBot right LED commands (recorded for web playback)."""
-        return
+        """Record GRITSBot right LED colours (3 x len(ids), 0-255) in ``self.leds``."""
+        self.leds.set(RIGHT, ids, colors)
+
+    # ── checkpoints ─────────────────────────────────────────────────────
+
+    def snapshot(self) -> dict:
+        """Capture the simulator state for a later ``restore()``.
+
+        Holds poses, commanded velocities, the step count, the history and LED
+        cursors and the global ``numpy.random``/``random`` states (the RNGs
+        experiment scripts draw from). Memory cost is O(N), plus the retained
+        frames for ``history='ring'``. A fork replica that has not been used
+        yet records its own fork-point RNG state, not the global one.
+        """
+        rng = self._pending_rng or {"numpy": np.random.get_state(), "random": random.getstate()}
+        return {
+            "poses": self.poses.copy(),
+            "dxu": self._dxu.copy(),
+            "velocities": self.velocities.copy(),
+            "steps": self._steps,
+            "branch": self._branches[-1][0],
+            "history": self.history.cursor(),
+            "leds": self.leds.snapshot(),
+            "rng": rng,
+        }
+
+    def restore(self, snapshot: dict) -> None:
+        """Rewind to ``snapshot``; frames recorded after it are discarded.
+
+        A snapshot stays valid while its frames are still part of this
+        simulator's timeline, i.e. it was taken on the current branch or
+        before the point an earlier ``restore()`` branched off.
+        """
+        for k, (branch, _) in enumerate(self._branches):
+            ends = self._branches[k + 1][1] if k + 1 < len(self._branches) else self._steps
+            if branch == snapshot["branch"] and snapshot["steps"] <= ends:
+                break
+        else:
+            raise ValueError("snapshot is not on this simulator's timeline")
+
+        self.poses[...] = snapshot["poses"]
+        self._dxu[...] = snapshot["dxu"]
+        self.velocities[...] = snapshot["velocities"]
+        self._steps = snapshot["steps"]
+        self.history.rewind(snapshot["history"])
+        self.leds.restore(snapshot["leds"])
+        np.random.set_state(snapshot["rng"]["numpy"])
+        random.setstate(snapshot["rng"]["random"])
+        self._pending_rng = None
+        self._branches = self._branches[: k + 1] + [(next(_BRANCH_IDS), self._steps)]
+
+    def fork(self, n: int, history: str | None = None, **history_options) -> list[Robotarium]:
+        """Clone the current state into ``n`` independent simulators.
+
+        Each replica copies this simulator's history unless ``history`` names a
+        fresh backend for it (required for ``history='memmap'`` runs; extra
+        ``history_length``/``history_dtype``/``history_path`` keywords are
+        passed through), in which case it starts recording at the fork point.
+        A ``history_path`` may contain ``{index}`` to give each replica its own
+        file.
+
+        Each replica also keeps the global ``numpy.random``/``random`` state of
+        the fork point and installs it the first time it is used (pose read,
+        velocity command or step). Replicas run one after another therefore
+        draw the same numbers a standalone run from the fork point would,
+        whatever earlier replicas consumed. Replicas stepped in lockstep
+        share the global RNGs after that first use.
+        """
+        rng = {"numpy": np.random.get_state(), "random": random.getstate()}
+        # Every timeline branches off here, so no snapshot taken after the fork
+        # by the parent or one replica restores into another.
+        shared = list(self._branches)
+        self._branches.append((next(_BRANCH_IDS), self._steps))
+        replicas = []
+        for index in range(int(n)):
+            memo = {}
+            if history is not None:
+                fresh = create_history(
+                    history,
+                    self.poses.shape,
+                    length=history_options.get("history_length"),
+                    dtype=history_options.get("history_dtype", np.float64),
+                    path=None
+                    if history_options.get("history_path") is None
+                    else str(history_options["history_path"]).format(index=index),
+                    metadata=getattr(self.history, "metadata", None),
+                )
+                fresh.append(self.poses)
+                memo[id(self.history)] = fresh
+            replica = copy.deepcopy(self, memo)
+            replica._poses_view = replica.poses.view()
+            replica._poses_view.flags.writeable = False
+            replica._pending_rng = copy.deepcopy(rng)
+            replica._branches = shared + [(next(_BRANCH_IDS), self._steps)]
+            replicas.append(replica)
+        return replicas
+
+    def _resume_rng(self) -> None:
+        if self._pending_rng is not None:
+            np.random.set_state(self._pending_rng["numpy"])
+            random.setstate(self._pending_rng["random"])
+            self._pending_rng = None
 
     # ── cleanup ─────────────────────────────────────────────────────────
 
     def call_at_scripts_end(self) -> None:
-        """Required Robotarium cleanup hook."""
-        return
+        """Required Robotarium cleanup hook (finalises history, reports timing)."""
+        if self.loop_timer is not None:
+            print(self.loop_timer.summary())
+        if self.pacer is not None:
+            print(self.pacer.summary())
+        close = getattr(self.history, "close", None)
+        if callable(close):
+            close()
+
+
+class BatchRobotarium(Robotarium):
+    """Ensemble of B independent Robotarium replicas stepped in one call.
+
+    Every state array gains a leading replica axis: poses are (B, 3, N) and
+    velocity commands (B, 2, N). Replicas never interact; each one follows the
+    same unicycle integration, velocity clipping, heading wrap and arena clamp
+    as a single ``Robotarium``, so ``poses[b]`` after k steps matches a
+    standalone run driven with the same commands.
+
+    ``get_poses`` returns (B, 3, N); ``set_velocities`` accepts either
+    (B, 2, len(ids)) per-replica commands or a (2, len(ids)) command
+    broadcast to every replica. Keyword arguments other than ``batch_size``
+    are those of ``Robotarium``.
+    """
+
+    def __init__(self, number_of_robots: int, batch_size: int, **kwargs) -> None:
+        self.batch_size = int(batch_size)
+        if self.batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        super().__init__(number_of_robots, **kwargs)
+
+    @property
+    def _leading_shape(self) -> tuple[int, ...]:
+        return (self.batch_size,)
+
+    def _initial_poses(self, initial_conditions: np.ndarray | None) -> np.ndarray:
+        shape = (self.batch_size, 3, self.number_of_robots)
+        if initial_conditions is None:
+            return np.zeros(shape)
+        poses = np.asarray(initial_conditions, dtype=float)
+        if poses.shape not in (shape, shape[1:]):
+            raise ValueError("initial_conditions must be shape (3, N) or (B, 3, N)")
+        return np.array(np.broadcast_to(poses, shape), copy=True)
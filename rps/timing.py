@@ -0,0 +1,253 @@
+"""Wall-clock pacing and timing instrumentation for the Robotarium simulator."""
+
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+PACER_PERCENTILES = (50, 95, 99)
+
+
+def _percentile_summary(samples: np.ndarray) -> dict:
+    """p50/p95/p99/max of ``samples`` in milliseconds (empty -> zeros)."""
+    if samples.size == 0:
+        return {f"p{q}": 0.0 for q in PACER_PERCENTILES} | {"max": 0.0}
+    values = np.percentile(samples, PACER_PERCENTILES) * 1e3
+    summary = {f"p{q}": float(v) for q, v in zip(PACER_PERCENTILES, values)}
+    summary["max"] = float(samples.max() * 1e3)
+    return summary
+
+
+class RealTimePacer:
+    """Monotonic-clock pacer that holds each simulation step to ``time_step``.
+
+    Times come from ``time.perf_counter()``: monotonic, and fine-grained even
+    on Windows, where ``time.monotonic()`` ticks every ~15.6 ms.
+
+    Deadlines are absolute (``start + k * time_step / speed``), so sleep
+    overshoot on one step is taken out of the next and no drift accumulates.
+    After a stall longer than ``max_catchup`` periods the schedule restarts
+    from the current time instead of bursting through the backlog. The
+    schedule starts at the first ``wait`` call, so script setup before the
+    loop is not counted.
+
+    ``speed`` scales wall time (2.0 runs twice as fast as the testbed, 0.5 at
+    half speed); ``speed=None`` disables sleeping entirely but still measures
+    how long each iteration took against the ``time_step`` budget.
+
+    Two series are kept per step, in seconds:
+        busy   - time from the previous release to this ``wait`` call per
+                 step, i.e. the user control code plus ``step()``; above the per-step budget
+                 (``time_step / speed``, or ``time_step`` unpaced) is an overrun
+        jitter - wake-up time minus deadline (paced mode only)
+    """
+
+    def __init__(self, time_step: float, speed: float | None = 1.0, max_catchup: int = 5) -> None:
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive or None")
+        self.time_step = float(time_step)
+        self.speed = None if speed is None else float(speed)
+        self.max_catchup = int(max_catchup)
+        self.period = self.time_step / self.speed if self.speed else 0.0
+        self.budget = self.period or self.time_step
+        self._busy: list[float] = []
+        self._jitter: list[float] = []
+        self._origin: float | None = None
+        self.resyncs = 0
+        self.steps = 0
+
+    def start(self) -> None:
+        """(Re)start the schedule from the current time."""
+        self._origin = time.perf_counter()
+        self._released = self._origin
+        self._deadline = self._origin
+
+    def wait(self, steps: int = 1) -> None:
+        """Block until ``steps`` more simulation steps are due."""
+        self.steps += steps
+        if self._origin is None:
+            self.start()
+            self._deadline += steps * self.period
+            return
+        arrived = time.perf_counter()
+        self._busy.append((arrived - self._released) / steps)
+        if self.speed is None:
+            self._released = arrived
+            return
+
+        self._deadline += steps * self.period
+        if arrived - self._deadline > self.max_catchup * self.period:
+            self._deadline = arrived
+            self.resyncs += 1
+        remaining = self._deadline - arrived
+        if remaining > 0:
+            time.sleep(remaining)
+        self._released = time.perf_counter()
+        self._jitter.append(self._released - self._deadline)
+
+    @property
+    def busy_samples(self) -> np.ndarray:
+        """Per-step busy time (control code + step) in seconds."""
+        return np.asarray(self._busy)
+
+    @property
+    def jitter_samples(self) -> np.ndarray:
+        """Per-step wake-up lateness relative to the deadline in seconds."""
+        return np.asarray(self._jitter)
+
+    def report(self) -> dict:
+        """Overrun count and busy/jitter percentiles (milliseconds)."""
+        busy = self.busy_samples
+        overruns = int(np.count_nonzero(busy > self.budget))
+        wall = time.perf_counter() - self._origin if self._origin is not None else 0.0
+        return {
+            "steps": self.steps,
+            "speed": self.speed,
+            "budget_ms": self.budget * 1e3,
+            "overruns": overruns,
+            "overrun_fraction": overruns / busy.size if busy.size else 0.0,
+            "resyncs": self.resyncs,
+            "wall_seconds": wall,
+            "sim_seconds": self.steps * self.time_step,
+            "busy_ms": _percentile_summary(busy),
+            "jitter_ms": _percentile_summary(self.jitter_samples),
+        }
+
+    def summary(self) -> str:
+        """One-paragraph human-readable version of ``report()``."""
+        rep = self.report()
+        mode = "as fast as possible" if self.speed is None else f"{self.speed:g}x real time"
+        busy = rep["busy_ms"]
+        lines = [
+            f"Real-time pacer ({mode}): {rep['steps']} steps, "
+            f"{rep['sim_seconds']:.1f} s simulated in {rep['wall_seconds']:.1f} s wall",
+            f"  overruns > {rep['budget_ms']:.1f} ms budget: {rep['overruns']} "
+            f"({100.0 * rep['overrun_fraction']:.1f}%), resyncs: {rep['resyncs']}",
+            f"  busy ms p50/p95/p99/max = {busy['p50']:.2f}/{busy['p95']:.2f}/"
+            f"{busy['p99']:.2f}/{busy['max']:.2f}",
+        ]
+        if self.speed is not None:
+            jit = rep["jitter_ms"]
+            lines.append(
+                f"  jitter ms p50/p95/p99/max = {jit['p50']:.2f}/{jit['p95']:.2f}/"
+                f"{jit['p99']:.2f}/{jit['max']:.2f}"
+            )
+        return "\n".join(lines)
+
+
+class StreamingHistogram:
+    """Log-spaced histogram of durations with exact max and raw samples.
+
+    Percentiles are read from the bin counts (``bins_per_decade`` sets the
+    resolution, about 12% wide bins by default) so summaries stay O(bins)
+    however long the run; the raw samples are also kept for offline analysis.
+    """
+
+    def __init__(self, low: float = 1e-6, high: float = 10.0, bins_per_decade: int = 20) -> None:
+        self._log_low = np.log10(low)
+        self._per_decade = bins_per_decade
+        self.edges = np.logspace(
+            self._log_low, np.log10(high), int(np.log10(high / low) * bins_per_decade) + 1
+        )
+        # Bin 0 collects underflow, the last bin overflow.
+        self.counts = np.zeros(self.edges.size + 1, dtype=np.int64)
+        self.count = 0
+        self.max = 0.0
+        self.total = 0.0
+        self._samples = np.empty(1024)
+
+    def add(self, seconds: float) -> None:
+        if seconds > 0:
+            index = int((np.log10(seconds) - self._log_low) * self._per_decade) + 1
+            index = min(max(index, 0), self.counts.size - 1)
+        else:
+            index = 0
+        self.counts[index] += 1
+        if self.count == self._samples.size:
+            self._samples = np.resize(self._samples, 2 * self._samples.size)
+        self._samples[self.count] = seconds
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def samples(self) -> np.ndarray:
+        """Every recorded duration in seconds, in arrival order."""
+        return self._samples[: self.count]
+
+    def percentile(self, q: float) -> float:
+        """Approximate q-th percentile (geometric centre of the covering bin)."""
+        if self.count == 0:
+            return 0.0
+        rank = np.searchsorted(np.cumsum(self.counts), q / 100.0 * self.count)
+        if rank == 0:
+            return float(self.edges[0])
+        if rank >= self.edges.size:
+            return self.max
+        return min(float(np.sqrt(self.edges[rank - 1] * self.edges[rank])), self.max)
+
+
+class LoopTimer:
+    """Times the two phases of a Robotarium control loop with a monotonic clock.
+
+    ``control`` is the user code between the end of one ``step()`` and the
+    start of the next (pose read, controllers, barriers); ``step`` is the time
+    spent inside ``step()`` itself, excluding any real-time pacing sleep.
+    """
+
+    PHASES = ("control", "step")
+
+    def __init__(self, budget: float) -> None:
+        self.budget = float(budget)
+        self.histograms = {phase: StreamingHistogram() for phase in self.PHASES}
+        self._entered: float | None = None
+        self._left: float | None = None
+
+    def start_step(self) -> None:
+        now = time.perf_counter()
+        if self._left is not None:
+            self.histograms["control"].add(now - self._left)
+        self._entered = now
+
+    def end_step(self) -> None:
+        now = time.perf_counter()
+        if self._entered is not None:
+            self.histograms["step"].add(now - self._entered)
+        self._left = now
+
+    def resume(self) -> None:
+        """Restart the control-phase clock (e.g. after a pacing sleep)."""
+        self._left = time.perf_counter()
+
+    def samples(self, phase: str) -> np.ndarray:
+        """Raw per-iteration durations (seconds) for ``control`` or ``step``."""
+        return self.histograms[phase].samples
+
+    def report(self) -> dict:
+        """p50/p95/p99/max per phase and for their sum, in milliseconds."""
+        out = {}
+        for phase, hist in self.histograms.items():
+            out[phase] = {f"p{q}": hist.percentile(q) * 1e3 for q in PACER_PERCENTILES}
+            out[phase]["max"] = hist.max * 1e3
+            out[phase]["count"] = hist.count
+        control = self.samples("control")
+        step = self.samples("step")
+        # Iteration k's loop time is its control phase plus the step that ends it.
+        loop = control + step[1 : control.size + 1]
+        out["loop"] = _percentile_summary(loop)
+        out["loop"]["over_budget"] = int(np.count_nonzero(loop > self.budget))
+        out["budget_ms"] = self.budget * 1e3
+        return out
+
+    def summary(self) -> str:
+        rep = self.report()
+        lines = [f"Loop timing ({rep['step']['count']} steps, budget {rep['budget_ms']:.0f} ms):"]
+        for phase in self.PHASES + ("loop",):
+            r = rep[phase]
+            lines.append(
+                f"  {phase:<7} ms p50/p95/p99/max = {r['p50']:.2f}/{r['p95']:.2f}/"
+                f"{r['p99']:.2f}/{r['max']:.2f}"
+            )
+        lines[-1] += f"  (over budget: {rep['loop']['over_budget']})"
+        return "\n".join(lines)
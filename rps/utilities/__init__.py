@@ -5,4 +5,7 @@ Submodules:
     controllers          - Position and pose controllers
     transformations      - SI <-> unicycle dynamics conversion
     misc                 - Graph Laplacians, convergence checkers
+    neighbors            - Spatial-hash neighbor search for pairwise interactions
+    obstacles            - Static obstacle maps as signed-distance grids
+    pipeline             - Fused barrier -> unicycle -> wheel-budget safety step
 """
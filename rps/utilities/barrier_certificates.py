@@ -1,30 +1,280 @@
+"""Barrier certificates keeping robots apart (and inside the arena).
+
+Every factory returns a closure barrier(dxi, x) (unicycle versions:
+barrier(dxu, x, out=None), written into ``out`` when given) and shares
+these options:
+
+- ``neighbor_search``: ``"dense"`` checks all N^2 pairs, ``"grid"`` uses
+  the spatial hash of rps.utilities.neighbors, ``"auto"`` the grid from
+  GRID_SEARCH_MIN_ROBOTS robots up; all give identical results.
+- ``neighbor_skin`` (metres, e.g. 0.05): keep a Verlet NeighborList across
+  calls (statistics on ``barrier.neighbor_list``, None when off); results
+  are unchanged.
+- ``obstacles`` (boundary versions): an rps.utilities.obstacles.ObstacleMap
+  replaces the hard-coded arena rectangle.
+- ``return_diagnostics``: return ``(velocities, diagnostics)``, see
+  _pair_diagnostics (closest_pair_distance gives an exact minimum on
+  demand); the QP adds ``active_constraints``, ``iterations``
+  and ``converged``, and unicycle barriers report at the projected points.
+- Ensembles: (B, 2, N) velocities with (B, 3, N) poses are processed in one
+  pass; replicas never interact and each slice equals a separate call (the
+  QP barriers solve one QP per replica, and their diagnostics are (B,)).
+"""
+
 from __future__ import annotations
 
+import time
+import warnings
+from functools import lru_cache
+
 import numpy as np
 
+from .neighbors import NeighborList, create_spatial_hash
+from .obstacles import ObstacleMap
+
+# Fraction of the penetration depth each robot of a close pair is pushed back.
+PUSH_GAIN = 0.3
+
+
+@lru_cache(maxsize=16)
+def _all_pairs(n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Index arrays (i, j) of every unordered pair i < j among n robots."""
+    i, j = np.triu_indices(n, k=1)
+    i.flags.writeable = False
+    j.flags.writeable = False
+    return i, j
+
+
+@lru_cache(maxsize=16)
+def _replica_pairs(replicas: int, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """All pairs i < j within each of ``replicas`` blocks of n robots (flat indices)."""
+    i, j = _all_pairs(n)
+    offset = (np.arange(replicas) * n)[:, None]
+    i, j = (i + offset).ravel(), (j + offset).ravel()
+    i.flags.writeable = False
+    j.flags.writeable = False
+    return i, j
+
+
+@lru_cache(maxsize=16)
+def _replica_labels(replicas: int, n: int) -> np.ndarray:
+    """Replica index of each robot once (B, ., N) arrays are flattened to (., B*N)."""
+    labels = np.repeat(np.arange(replicas), n)
+    labels.flags.writeable = False
+    return labels
+
+
+def _flatten_replicas(a) -> np.ndarray:
+    """(B, R, N) -> (R, B*N), replica-major along the robot axis."""
+    a = np.asarray(a, dtype=float)
+    return a.transpose(1, 0, 2).reshape(a.shape[1], -1)
+
+
+def _batchable(core):
+    """Barrier accepting 2xN / 3xN arrays or (B, 2, N) / (B, 3, N) ensembles.
+
+    ``core(dxi, x, labels)`` works on one flat set of robots; an ensemble is
+    flattened to B*N robots labelled by replica, so pairs never cross
+    replicas and each replica's result is exactly that of a separate call.
+    """
+
+    def barrier(dxi: np.ndarray, x: np.ndarray):
+        if np.ndim(x) == 2:
+            return core(dxi, x, None)
+        replicas, _, n = np.shape(x)
+        result = core(_flatten_replicas(dxi), _flatten_replicas(x), _replica_labels(replicas, n))
+        flat, diagnostics = result if isinstance(result, tuple) else (result, None)
+        safe = np.ascontiguousarray(flat.reshape(2, replicas, n).transpose(1, 0, 2))
+        if diagnostics is None:
+            return safe
+        diagnostics["correction"] = diagnostics["correction"].reshape(replicas, n)
+        return safe, diagnostics
+
+    return barrier
+
+
+# Swarm size from which neighbor_search="auto" switches from all pairs to the
+# spatial hash (measured with benchmarks/bench_barriers.py).
+GRID_SEARCH_MIN_ROBOTS = 64
+
+NEIGHBOR_SEARCH = ("auto", "dense", "grid")
+
+
+def _create_pair_search(
+    safety_radius: float, neighbor_search: str, neighbor_skin: float | None = None
+):
+    """Candidate-pair generator (x_2xN, labels=None) -> (i, j) with i < j.
+
+    ``labels`` are the replica indices from _replica_labels; pairs then stay
+    within a replica and "auto" decides on the per-replica robot count.
+    With ``neighbor_skin`` the generator is a NeighborList over the chosen
+    search, so pairs are only regenerated once robots have moved far enough.
+    """
+    if neighbor_search not in NEIGHBOR_SEARCH:
+        raise ValueError(
+            f"neighbor_search must be one of {NEIGHBOR_SEARCH}, got {neighbor_search!r}"
+        )
+    search_radius = safety_radius + (neighbor_skin or 0.0)
+    grid = create_spatial_hash(search_radius)
+
+    def pairs(x: np.ndarray, labels: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        replicas = 1 if labels is None else int(labels[-1]) + 1
+        n = x.shape[1] // replicas
+        if neighbor_search == "dense" or (neighbor_search == "auto" and n < GRID_SEARCH_MIN_ROBOTS):
+            return _all_pairs(n) if labels is None else _replica_pairs(replicas, n)
+        return grid(x[:2], labels)
+
+    if neighbor_skin is None:
+        return pairs
+    return NeighborList(safety_radius, neighbor_skin, candidates=pairs)
+
+
+def closest_pair_distance(x: np.ndarray, cell_size: float = 0.2) -> float | np.ndarray:
+    """Exact smallest pair distance of 3xN poses, or per replica of (B, 3, N).
+
+    Barrier diagnostics only see pairs within their search radius; call this
+    when the exact minimum of a sparse swarm is needed. Hashes with cells of
+    ``cell_size``, doubling it until every replica has a pair closer than
+    the cell, in O(N log N) per round. inf below two robots.
+    """
+    x = np.asarray(x, dtype=float)
+    if x.ndim == 2:
+        return float(closest_pair_distance(x[None], cell_size)[0])
+    replicas, _, n = x.shape
+    xy = _flatten_replicas(x)[:2]
+    labels = _replica_labels(replicas, n) if replicas > 1 else None
+    distance = np.full(replicas, np.inf)
+    pending = np.full(replicas, n >= 2)
+    for _ in range(64):
+        if not pending.any():
+            break
+        i, j = create_spatial_hash(cell_size)(xy, labels)
+        found = np.full(replicas, np.inf)
+        owner = np.zeros(i.size, dtype=np.intp) if labels is None else labels[i]
+        np.minimum.at(found, owner, np.hypot(xy[0, i] - xy[0, j], xy[1, i] - xy[1, j]))
+        done = pending & (found < cell_size)
+        distance[done] = found[done]
+        pending &= ~done
+        cell_size *= 2.0
+    return distance
+
+
+def _pair_diagnostics(
+    i: np.ndarray,
+    j: np.ndarray,
+    dist: np.ndarray,
+    safety_radius: float,
+    search_radius: float,
+    labels: np.ndarray | None,
+) -> dict:
+    """Safety telemetry from the candidate pairs (i, j) a barrier measured.
+
+    ``close_pairs`` counts pairs closer than safety_radius, ``min_distance``
+    is the smallest pair distance if below ``search_radius`` (the candidates
+    cover that range) and inf otherwise, ``worst_pair`` is (i, j) of that
+    pair when it penetrates, else None, and ``penetration`` is
+    max(0, safety_radius - min_distance). With ``labels`` every entry is per
+    replica: (B,) arrays and a (B, 2) worst_pair of replica-local indices,
+    -1 where none penetrates.
+    """
+    replicas = 1 if labels is None else int(labels[-1]) + 1
+    owner = np.zeros(i.size, dtype=np.intp) if labels is None else labels[i]
+    close_pairs = np.bincount(owner[dist < safety_radius], minlength=replicas)
+    min_distance = np.full(replicas, np.inf)
+    near = dist < search_radius
+    np.minimum.at(min_distance, owner[near], dist[near])
+    worst_pair = np.full((replicas, 2), -1, dtype=np.intp)
+    if i.size:
+        order = np.lexsort((dist, owner))
+        first = order[np.r_[True, owner[order][1:] != owner[order][:-1]]]
+        first = first[dist[first] < safety_radius]
+        size = 0 if labels is None else labels.size // replicas
+        worst_pair[owner[first]] = (
+            np.stack([i[first], j[first]], axis=1) - (owner[first] * size)[:, None]
+        )
+    penetration = np.maximum(safety_radius - min_distance, 0.0)
+    if labels is not None:
+        return {
+            "close_pairs": close_pairs,
+            "min_distance": min_distance,
+            "worst_pair": worst_pair,
+            "penetration": penetration,
+        }
+    return {
+        "close_pairs": int(close_pairs[0]),
+        "min_distance": float(min_distance[0]),
+        "worst_pair": tuple(int(k) for k in worst_pair[0]) if worst_pair[0, 0] >= 0 else None,
+        "penetration": float(penetration[0]),
+    }
+
+
+def _finish(safe: np.ndarray, dxi, diagnostics: dict | None):
+    """``safe``, or ``(safe, diagnostics)`` with the per-robot correction added."""
+    if diagnostics is None:
+        return safe
+    change = safe - np.asarray(dxi, dtype=float)
+    diagnostics["correction"] = np.hypot(change[0], change[1])
+    return safe, diagnostics
+
+
+def _pairwise_push(
+    x: np.ndarray,
+    safety_radius: float,
+    pairs: tuple[np.ndarray, np.ndarray] | None = None,
+    labels: np.ndarray | None = None,
+    diagnostics: dict | None = None,
+) -> np.ndarray:
+    """Total repulsive correction (2xN) from every pair closer than safety_radius.
+
+    Each pair at distance 1e-6 < d < safety_radius pushes robot i by
+    PUSH_GAIN * (safety_radius - d) along the unit vector from j to i and robot
+    j by the opposite amount, exactly as the original per-pair loop did.
+    ``pairs`` restricts the search to candidate (i, j) index arrays with i < j
+    (default: all pairs); close pairs are summed in (i, j) order either way,
+    so the result does not depend on how candidates were found.
+    A ``diagnostics`` dict is filled with _pair_diagnostics of the candidates.
+    """
+    n = x.shape[1]
+    i, j = _all_pairs(n) if pairs is None else pairs
+    diff = x[:2, i] - x[:2, j]
+    dist = np.hypot(diff[0], diff[1])
+    if diagnostics is not None:
+        diagnostics.update(_pair_diagnostics(i, j, dist, safety_radius, safety_radius, labels))
+    close = (dist < safety_radius) & (dist > 1e-6)
+    i, j, diff, dist = i[close], j[close], diff[:, close], dist[close]
+    if pairs is not None:
+        order = np.argsort(i * n + j)
+        i, j, diff, dist = i[order], j[order], diff[:, order], dist[order]
+
+    push = diff * (PUSH_GAIN * (safety_radius - dist) / dist)
+    correction = np.empty((2, n))
+    for axis in range(2):
+        correction[axis] = np.bincount(i, push[axis], minlength=n) - np.bincount(
+            j, push[axis], minlength=n
+        )
+    return correction
+
 
 def create_single_integrator_barrier_certificate(
     safety_radius: float = 0.17,
     barrier_gain: float = 100.0,
     magnitude_limit: float = 0.2,
+    neighbor_search: str = "auto",
+    neighbor_skin: float | None = None,
+    return_diagnostics: bool = False,
 ):
     """Single-integrator barrier certificate (no boundary, matches Robotarium API).
 
     Applies pairwise repulsive corrections when robots are within safety_radius.
+    See the module docstring for the shared options.
     """
+    pair_search = _create_pair_search(safety_radius, neighbor_search, neighbor_skin)
 
-    def barrier(dxi: np.ndarray, x: np.ndarray) -> np.ndarray:
+    @_batchable
+    def barrier(dxi: np.ndarray, x: np.ndarray, labels: np.ndarray | None):
+        diagnostics = {} if return_diagnostics else None
         safe = np.array(dxi, dtype=float, copy=True)
-        n = x.shape[1]
-
-        for i in range(n):
-            for j in range(i + 1, n):
-                diff = x[:2, i] - x[:2, j]
-                dist = np.linalg.norm(diff)
-                if dist < safety_radius and dist > 1e-6:
-                    push = (safety_radius - dist) * (diff / dist)
-                    safe[:, i] += 0.3 * push
-                    safe[:, j] -= 0.3 * push
+        safe += _pairwise_push(x, safety_radius, pair_search(x, labels), labels, diagnostics)
 
         # Magnitude limiting
         mag = np.linalg.norm(safe, axis=0)
@@ -32,8 +282,9 @@ def create_single_integrator_barrier_certificate(
         if np.any(over):
             safe[:, over] *= magnitude_limit / mag[over]
 
-        return safe
+        return _finish(safe, dxi, diagnostics)
 
+    barrier.neighbor_list = pair_search if neighbor_skin is not None else None
     return barrier
 
 
@@ -41,87 +292,556 @@ def create_single_integrator_barrier_certificate_with_boundary(
     safety_radius: float = 0.17,
     boundary_margin: float = 0.05,
     magnitude_limit: float = 0.2,
+    neighbor_search: str = "auto",
+    neighbor_skin: float | None = None,
+    obstacles: ObstacleMap | None = None,
+    return_diagnostics: bool = False,
 ):
     """Single-integrator barrier certificate with boundary enforcement.
 
     Applies pairwise repulsive corrections and arena boundary reflection.
-    Arena bounds: [-1.6, 1.6] x [-1.0, 1.0].
+    Arena bounds: [-1.6, 1.6] x [-1.0, 1.0], or the ``obstacles`` map, where
+    a robot within boundary_margin of a surface has its inward velocity
+    reflected about the surface normal.
     """
+    pair_search = _create_pair_search(safety_radius, neighbor_search, neighbor_skin)
 
-    def barrier(dxi: np.ndarray, x: np.ndarray) -> np.ndarray:
+    @_batchable
+    def barrier(dxi: np.ndarray, x: np.ndarray, labels: np.ndarray | None):
+        diagnostics = {} if return_diagnostics else None
         safe = np.array(dxi, dtype=float, copy=True)
-        n = x.shape[1]
-
-        for i in range(n):
-            for j in range(i + 1, n):
-                diff = x[:2, i] - x[:2, j]
-                dist = np.linalg.norm(diff)
-                if dist < safety_radius and dist > 1e-6:
-                    push = (safety_radius - dist) * (diff / dist)
-                    safe[:, i] += 0.3 * push
-                    safe[:, j] -= 0.3 * push
-
-            # Boundary enforcement
-            if x[0, i] < -1.6 + boundary_margin:
-                safe[0, i] = abs(safe[0, i])
-            if x[0, i] > 1.6 - boundary_margin:
-                safe[0, i] = -abs(safe[0, i])
-            if x[1, i] < -1.0 + boundary_margin:
-                safe[1, i] = abs(safe[1, i])
-            if x[1, i] > 1.0 - boundary_margin:
-                safe[1, i] = -abs(safe[1, i])
+        safe += _pairwise_push(x, safety_radius, pair_search(x, labels), labels, diagnostics)
+
+        if obstacles is not None:
+            clearance, outward = obstacles.query(x[:2])
+            inward = (safe * outward).sum(axis=0)
+            reflect = (clearance < boundary_margin) & (inward < 0)
+            safe[:, reflect] -= 2.0 * inward[reflect] * outward[:, reflect]
+            return _finish(safe, dxi, diagnostics)
+
+        # Boundary enforcement: point the velocity back into the arena
+        low_x = x[0] < -1.6 + boundary_margin
+        high_x = x[0] > 1.6 - boundary_margin
+        low_y = x[1] < -1.0 + boundary_margin
+        high_y = x[1] > 1.0 - boundary_margin
+        safe[0, low_x] = np.abs(safe[0, low_x])
+        safe[0, high_x] = -np.abs(safe[0, high_x])
+        safe[1, low_y] = np.abs(safe[1, low_y])
+        safe[1, high_y] = -np.abs(safe[1, high_y])
+
+        return _finish(safe, dxi, diagnostics)
+
+    barrier.neighbor_list = pair_search if neighbor_skin is not None else None
+    return barrier
 
-        return safe
 
+# ── Minimum-deviation QP barrier certificate ────────────────────────────────
+
+# Boundary constraints use this fraction of barrier_gain, as on the Robotarium.
+BOUNDARY_GAIN_FRACTION = 0.4
+
+# Constraint normals of the x_max, x_min, y_max and y_min walls.
+_WALL_NORMALS = np.array([[1.0, -1.0, 0.0, 0.0], [0.0, 0.0, 1.0, -1.0]])
+
+# Gradient iterations between exact active-set solves in BarrierQPSolver.
+POLISH_EVERY = 5
+# Active-set corrections tried per exact solve before resuming the gradient.
+POLISH_ROUNDS = 3
+# Largest support solved exactly (a dense k x k system); bigger active sets,
+# e.g. a jammed flock of hundreds, are left to the gradient iterations.
+POLISH_MAX_ROWS = 256
+
+
+def _activation_distance(
+    safety_radius: float, barrier_gain: float, magnitude_limit: float
+) -> float:
+    """Smallest separation d beyond which the pair constraint cannot bind.
+
+    A pair constraint 2 (x_i - x_j)^T (u_j - u_i) <= gain * h^3 with
+    h = d^2 - r^2 is slack for any inputs of norm <= magnitude_limit once
+    gain * h^3 >= 4 d magnitude_limit; found by bisection (the left side
+    minus the right is increasing in d beyond the safety radius).
+    """
+
+    def slack(d: float) -> float:
+        return barrier_gain * (d * d - safety_radius**2) ** 3 - 4.0 * d * magnitude_limit
+
+    lo, hi = safety_radius, safety_radius + 1.0
+    while slack(hi) < 0:
+        hi *= 2.0
+    for _ in range(60):
+        mid = 0.5 * (lo + hi)
+        if slack(mid) < 0:
+            lo = mid
+        else:
+            hi = mid
+    return hi
+
+
+class BarrierQPSolver:
+    """Warm-started dual projected-gradient solver for the SI barrier QP.
+
+    Solves min ||u - u_nom||^2 s.t. a_k^T u <= b_k by FISTA on the dual plus
+    exact active-set solves of up to POLISH_MAX_ROWS rows; multipliers are
+    kept by constraint key to warm-start the next call. A solve that reaches
+    ``max_iterations`` short of ``tolerance`` sets ``converged`` to False and
+    emits a RuntimeWarning; ``report()`` summarises the per-call statistics.
+    """
+
+    def __init__(
+        self, tolerance: float = 1e-6, max_iterations: int = 200, warm_start: bool = True
+    ) -> None:
+        if tolerance <= 0:
+            raise ValueError("tolerance must be positive")
+        if max_iterations < 1:
+            raise ValueError("max_iterations must be at least 1")
+        self.tolerance = float(tolerance)
+        self.max_iterations = int(max_iterations)
+        self.warm_start = bool(warm_start)
+        self.iterations: list[int] = []
+        self.solve_times: list[float] = []
+        self.constraints: list[int] = []
+        self.unconverged = 0
+        self.converged = True
+        self.active_constraints = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the stored multipliers so the next solve starts cold."""
+        self._keys = np.empty(0, dtype=np.int64)
+        self._duals = np.empty(0)
+
+    def _initial_duals(self, keys: np.ndarray) -> np.ndarray:
+        duals = np.zeros(keys.size)
+        if not self.warm_start or self._keys.size == 0 or keys.size == 0:
+            return duals
+        slot = np.minimum(np.searchsorted(self._keys, keys), self._keys.size - 1)
+        found = self._keys[slot] == keys
+        duals[found] = self._duals[slot[found]]
+        return duals
+
+    def solve(
+        self,
+        u_nom: np.ndarray,
+        pair_i: np.ndarray,
+        pair_j: np.ndarray,
+        normals: np.ndarray,
+        pair_b: np.ndarray,
+        bound_robot: np.ndarray,
+        bound_normals: np.ndarray,
+        bound_b: np.ndarray,
+        keys: np.ndarray,
+    ) -> np.ndarray:
+        """Minimum-deviation velocities (2xN) for unit-normal constraints.
+
+        Pair row k reads normals[:, k]^T (u_j - u_i) <= pair_b[k] with
+        |normals[:, k]| = 1/sqrt(2); boundary row m reads
+        bound_normals[:, m]^T u[:, bound_robot[m]] <= bound_b[m] with a unit
+        normal (a wall, or the inward normal of an obstacle).
+        ``keys`` identifies the pair rows followed by the boundary rows.
+        """
+        start = time.perf_counter()
+        n = u_nom.shape[1]
+        n_pairs = pair_i.size
+        b = np.concatenate([pair_b, bound_b])
+        lam = self._initial_duals(keys)
+
+        # Gershgorin bound on the spectral norm of A A^T: a pair row puts
+        # weight 1/sqrt(2) on each of its robots, a boundary row weight 1.
+        half = np.sqrt(0.5)
+        load = (
+            np.bincount(pair_i, minlength=n) * half
+            + np.bincount(pair_j, minlength=n) * half
+            + np.bincount(bound_robot, minlength=n)
+        )
+        step_bound = max(
+            float((half * (load[pair_i] + load[pair_j])).max(initial=0.0)),
+            float(load[bound_robot].max(initial=0.0)),
+            1.0,
+        )
+        step = 1.0 / step_bound
+
+        def primal(duals: np.ndarray) -> np.ndarray:
+            weighted = normals * duals[:n_pairs]
+            u = u_nom.copy()
+            for axis in range(2):
+                u[axis] += np.bincount(pair_i, weighted[axis], minlength=n)
+                u[axis] -= np.bincount(pair_j, weighted[axis], minlength=n)
+            weighted = bound_normals * duals[n_pairs:]
+            for axis in range(2):
+                u[axis] -= np.bincount(bound_robot, weighted[axis], minlength=n)
+            return u
+
+        def residual(u: np.ndarray) -> np.ndarray:
+            rel = u[:, pair_j] - u[:, pair_i]
+            pair = normals[0] * rel[0] + normals[1] * rel[1]
+            bound = (bound_normals * u[:, bound_robot]).sum(axis=0)
+            return np.concatenate([pair, bound]) - b
+
+        # Each row as (row, flat column 2 * robot + axis, value) entries.
+        rows = np.arange(b.size)
+        entry_row = np.concatenate([np.repeat(rows[:n_pairs], 4), np.repeat(rows[n_pairs:], 2)])
+        entry_col = np.concatenate(
+            [
+                np.stack([2 * pair_i, 2 * pair_i + 1, 2 * pair_j, 2 * pair_j + 1], axis=1).ravel(),
+                np.stack([2 * bound_robot, 2 * bound_robot + 1], axis=1).ravel(),
+            ]
+        )
+        entry_val = np.concatenate(
+            [
+                np.stack([-normals[0], -normals[1], normals[0], normals[1]], axis=1).ravel(),
+                bound_normals.T.ravel(),
+            ]
+        )
+        slack = residual(u_nom)
+
+        def polish(support: np.ndarray) -> np.ndarray | None:
+            """KKT point found by a few active-set corrections of ``support``.
+
+            Each round solves the rows in ``support`` as equalities, then
+            drops rows with negative multipliers and adds violated rows.
+            """
+            for _ in range(POLISH_ROUNDS):
+                if np.count_nonzero(support) > POLISH_MAX_ROWS:
+                    return None
+                duals = np.zeros(b.size)
+                if support.any():
+                    index = np.flatnonzero(support)
+                    position = np.full(b.size, -1)
+                    position[index] = np.arange(index.size)
+                    chosen = support[entry_row]
+                    cols, col_index = np.unique(entry_col[chosen], return_inverse=True)
+                    local = np.zeros((index.size, cols.size))
+                    local[position[entry_row[chosen]], col_index] = entry_val[chosen]
+                    gram = local @ local.T
+                    try:
+                        duals[index] = np.linalg.solve(gram, slack[index])
+                    except np.linalg.LinAlgError:  # degenerate contacts (jams)
+                        duals[index] = np.linalg.lstsq(gram, slack[index], rcond=None)[0]
+                violated = residual(primal(np.maximum(duals, 0.0))) > self.tolerance
+                negative = duals < -self.tolerance
+                if not violated.any() and not negative.any():
+                    return np.maximum(duals, 0.0)
+                support = (support & ~negative) | violated
+            return None
+
+        # Projected gradient finds the active set; an exact solve on the
+        # current support (tried first on the warm start, then every few
+        # iterations) certifies optimality, which usually ends the solve early.
+        y, t, iterations, converged = lam.copy(), 1.0, 0, b.size == 0
+        tried = None
+        while not converged and iterations < self.max_iterations:
+            iterations += 1
+            support = lam > 0
+            if iterations % POLISH_EVERY == 1 and (tried is None or np.any(support != tried)):
+                exact = polish(support)
+                if exact is not None:
+                    lam, converged = exact, True
+                    break
+                tried = support
+            lam_next = np.maximum(0.0, y + step * residual(primal(y)))
+            converged = np.abs(lam_next - y).max() * step_bound <= self.tolerance
+            if np.dot(y - lam_next, lam_next - lam) > 0:
+                t = 1.0  # adaptive restart: momentum is pointing uphill
+            t_next = 0.5 * (1.0 + np.sqrt(1.0 + 4.0 * t * t))
+            y = lam_next + ((t - 1.0) / t_next) * (lam_next - lam)
+            lam, t = lam_next, t_next
+
+        order = np.argsort(keys)
+        self._keys, self._duals = keys[order], lam[order]
+        self.iterations.append(iterations)
+        self.active_constraints = int(np.count_nonzero(lam > 0))
+        self.constraints.append(int(b.size))
+        self.unconverged += not converged
+        self.converged = bool(converged)
+        if not converged:
+            reason = f"{self.active_constraints} active constraints"
+            if self.active_constraints > POLISH_MAX_ROWS:
+                reason += f", above the exact-solve limit POLISH_MAX_ROWS={POLISH_MAX_ROWS}"
+            warnings.warn(
+                f"barrier QP stopped at max_iterations={self.max_iterations} "
+                f"without converging ({reason})",
+                RuntimeWarning,
+                stacklevel=4,
+            )
+        self.solve_times.append(time.perf_counter() - start)
+        return primal(lam)
+
+    def report(self) -> dict:
+        """Solve count, iteration and constraint counts, timing (ms)."""
+        iterations = np.asarray(self.iterations)
+        times = np.asarray(self.solve_times) * 1e3
+        if iterations.size == 0:
+            return {"solves": 0, "unconverged": 0}
+        return {
+            "solves": int(iterations.size),
+            "unconverged": self.unconverged,
+            "iterations_mean": float(iterations.mean()),
+            "iterations_p95": float(np.percentile(iterations, 95)),
+            "iterations_max": int(iterations.max()),
+            "constraints_mean": float(np.mean(self.constraints)),
+            "solve_ms_mean": float(times.mean()),
+            "solve_ms_p95": float(np.percentile(times, 95)),
+            "solve_ms_max": float(times.max()),
+        }
+
+
+def _create_qp_barrier(
+    safety_radius: float,
+    barrier_gain: float,
+    magnitude_limit: float,
+    boundary_points,
+    obstacles,
+    neighbor_search: str,
+    neighbor_skin: float | None,
+    tolerance: float,
+    max_iterations: int,
+    warm_start: bool,
+    return_diagnostics: bool,
+):
+    activation = _activation_distance(safety_radius, barrier_gain, magnitude_limit)
+    pair_search = _create_pair_search(activation, neighbor_search, neighbor_skin)
+    # Replica b of an ensemble keeps its own solver (warm start, statistics),
+    # so its QP is exactly the one a separate barrier would solve.
+    solvers = [BarrierQPSolver(tolerance, max_iterations, warm_start)]
+    # A constraint whose bound exceeds what inputs of norm magnitude_limit can
+    # reach is slack at the nominal input; only the others enter the QP.
+    pair_reach = np.sqrt(2.0) * magnitude_limit
+
+    @_batchable
+    def barrier(dxi: np.ndarray, x: np.ndarray, labels: np.ndarray | None):
+        replicas = 1 if labels is None else int(labels[-1]) + 1
+        n = x.shape[1] // replicas
+        u_nom = np.array(dxi, dtype=float, copy=True)
+        mag = np.hypot(u_nom[0], u_nom[1])
+        over = mag > magnitude_limit
+        if np.any(over):
+            u_nom[:, over] *= magnitude_limit / mag[over]
+
+        i, j = pair_search(x, labels)
+        diff = x[:2, i] - x[:2, j]
+        dist = np.hypot(diff[0], diff[1])
+        diagnostics = None
+        if return_diagnostics:
+            diagnostics = _pair_diagnostics(i, j, dist, safety_radius, activation, labels)
+        # Row 2 d^T (u_j - u_i) <= gain h^3 divided by its norm 2 sqrt(2) |d|.
+        pair_b = barrier_gain * (dist * dist - safety_radius**2) ** 3
+        pair_b /= 2.0 * np.sqrt(2.0) * np.maximum(dist, 1e-12)
+        keep = np.flatnonzero((dist > 1e-6) & (pair_b < pair_reach))
+        # (i, j) order, which also groups the rows by replica.
+        keep = keep[np.argsort(i[keep] * x.shape[1] + j[keep], kind="stable")]
+        i, j, diff, dist, pair_b = i[keep], j[keep], diff[:, keep], dist[keep], pair_b[keep]
+        normals = diff / (np.sqrt(2.0) * dist)
+
+        half = 0.5 * safety_radius
+        if obstacles is not None:
+            # One row per robot: -normal^T u <= 0.4 gain (d - r/2)^3.
+            clearance, outward = obstacles.query(x[:2])
+            bound_b = BOUNDARY_GAIN_FRACTION * barrier_gain * (clearance - half) ** 3
+            robot = np.flatnonzero(bound_b < magnitude_limit)
+            side = np.zeros(robot.size, dtype=np.intp)
+            bound_b, bound_normals = bound_b[robot], -outward[:, robot]
+        elif boundary_points is not None:
+            x_min, x_max, y_min, y_max = boundary_points
+            gap = np.stack(
+                [x_max - half - x[0], x[0] - x_min - half, y_max - half - x[1], x[1] - y_min - half]
+            )
+            bound_b = BOUNDARY_GAIN_FRACTION * barrier_gain * gap**3
+            side, robot = np.nonzero(bound_b < magnitude_limit)
+            bound_b = bound_b[side, robot]
+            bound_normals = _WALL_NORMALS[:, side]
+        else:
+            robot = side = np.empty(0, dtype=np.intp)
+            bound_b, bound_normals = np.empty(0), np.empty((2, 0))
+
+        # One QP per replica over its own rows, in replica-local indices.
+        order = np.argsort(robot // n, kind="stable")
+        robot, side, bound_b = robot[order], side[order], bound_b[order]
+        bound_normals = bound_normals[:, order]
+        blocks = np.arange(replicas + 1) * n
+        pair_at = np.searchsorted(i, blocks)
+        bound_at = np.searchsorted(robot, blocks)
+        while len(solvers) < replicas:
+            solvers.append(BarrierQPSolver(tolerance, max_iterations, warm_start))
+        safe = np.empty_like(u_nom)
+        for b in range(replicas):
+            p = slice(pair_at[b], pair_at[b + 1])
+            q = slice(bound_at[b], bound_at[b + 1])
+            first = blocks[b]
+            pi, pj, rb = i[p] - first, j[p] - first, robot[q] - first
+            keys = np.concatenate([pi * n + pj, n * n + 4 * rb + side[q]])
+            safe[:, first : first + n] = solvers[b].solve(
+                u_nom[:, first : first + n],
+                pi,
+                pj,
+                normals[:, p],
+                pair_b[p],
+                rb,
+                bound_normals[:, q],
+                bound_b[q],
+                keys,
+            )
+        if diagnostics is not None:
+            used = solvers[:replicas]
+            stats = {
+                "active_constraints": [s.active_constraints for s in used],
+                "iterations": [s.iterations[-1] for s in used],
+                "converged": [s.converged for s in used],
+            }
+            for name, values in stats.items():
+                diagnostics[name] = values[0] if labels is None else np.array(values)
+        return _finish(safe, dxi, diagnostics)
+
+    barrier.solver = solvers[0]
+    barrier.solvers = solvers
+    barrier.neighbor_list = pair_search if neighbor_skin is not None else None
     return barrier
 
 
-def create_unicycle_barrier_certificate(
-    safety_radius: float = 0.15,
-    projection_distance: float = 0.05,
+def create_single_integrator_barrier_certificate_qp(
+    safety_radius: float = 0.17,
     barrier_gain: float = 100.0,
     magnitude_limit: float = 0.2,
+    tolerance: float = 1e-6,
+    max_iterations: int = 200,
+    warm_start: bool = True,
+    neighbor_search: str = "auto",
+    neighbor_skin: float | None = None,
+    return_diagnostics: bool = False,
 ):
-    """Unicycle barrier certificate (no boundary, matches Robotarium API).
-
-    Projects unicycle positions forward by projection_distance, applies
-    SI barrier, then returns corrected unicycle velocities.
+    """Minimum-deviation CBF QP barrier certificate (numpy only, no boundary).
+
+    Inputs are normalised to magnitude_limit, then u minimises ||u - dxi||^2
+    subject to -2 (x_i - x_j)^T (u_i - u_j) <= barrier_gain * (|x_i - x_j|^2 - r^2)^3,
+    as on the Robotarium server. Solver statistics are on ``barrier.solver``
+    (see BarrierQPSolver), and on ``barrier.solvers[b]`` for replica b of an
+    ensemble, which is solved as its own QP. Active sets above POLISH_MAX_ROWS (256) rows, e.g.
+    jams of hundreds of robots, may stop at ``max_iterations`` with a
+    RuntimeWarning.
     """
+    return _create_qp_barrier(
+        safety_radius,
+        barrier_gain,
+        magnitude_limit,
+        None,
+        None,
+        neighbor_search,
+        neighbor_skin,
+        tolerance,
+        max_iterations,
+        warm_start,
+        return_diagnostics,
+    )
 
-    si_barrier = create_single_integrator_barrier_certificate(
-        safety_radius=safety_radius,
-        barrier_gain=barrier_gain,
-        magnitude_limit=magnitude_limit,
+
+def create_single_integrator_barrier_certificate_qp_with_boundary(
+    safety_radius: float = 0.17,
+    barrier_gain: float = 100.0,
+    magnitude_limit: float = 0.2,
+    boundary_points=(-1.6, 1.6, -1.0, 1.0),
+    obstacles: ObstacleMap | None = None,
+    tolerance: float = 1e-6,
+    max_iterations: int = 200,
+    warm_start: bool = True,
+    neighbor_search: str = "auto",
+    neighbor_skin: float | None = None,
+    return_diagnostics: bool = False,
+):
+    """Minimum-deviation CBF QP barrier certificate with arena boundary.
+
+    As create_single_integrator_barrier_certificate_qp, plus per-robot wall
+    constraints u <= 0.4 * barrier_gain * (gap - r/2)^3 towards each side of
+    ``boundary_points``, or one constraint per robot against the nearest
+    surface of an ``obstacles`` map.
+    """
+    return _create_qp_barrier(
+        safety_radius,
+        barrier_gain,
+        magnitude_limit,
+        tuple(boundary_points),
+        obstacles,
+        neighbor_search,
+        neighbor_skin,
+        tolerance,
+        max_iterations,
+        warm_start,
+        return_diagnostics,
     )
 
-    def barrier(dxu: np.ndarray, x: np.ndarray) -> np.ndarray:
-        n = x.shape[1]
-        theta = x[2, :]
+
+def _wrap_unicycle(si_barrier, projection_distance: float):
+    """Unicycle barrier running ``si_barrier`` at points projected ahead.
+
+    The projected positions, SI velocities and heading cos/sin live in work
+    buffers kept by the closure and reallocated only when the shape of the
+    poses changes, and both conversions are single broadcasted expressions.
+    A leading ensemble dimension ((B, 2, N) commands, (B, 3, N) poses) is
+    carried straight through to the batched SI barrier.
+    """
+    inverse_distance = 1.0 / max(projection_distance, 1e-6)
+    work: dict[str, np.ndarray] = {}
+
+    def barrier(dxu: np.ndarray, x: np.ndarray, out: np.ndarray | None = None):
+        shape = x.shape[:-2] + (2, x.shape[-1])
+        if work.get("trig", np.empty(0)).shape != shape:
+            work.update(trig=np.empty(shape), x_proj=np.empty(shape), dxi=np.empty(shape))
+        trig, x_proj, dxi = work["trig"], work["x_proj"], work["dxi"]
+        cos, sin = trig[..., 0, :], trig[..., 1, :]
+        np.cos(x[..., 2, :], out=cos)
+        np.sin(x[..., 2, :], out=sin)
 
         # Project positions forward (account for heading)
-        x_proj = np.zeros((2, n))
-        x_proj[0, :] = x[0, :] + projection_distance * np.cos(theta)
-        x_proj[1, :] = x[1, :] + projection_distance * np.sin(theta)
+        np.multiply(trig, projection_distance, out=x_proj)
+        x_proj += x[..., :2, :]
 
         # Convert unicycle velocities to SI velocities at projected point
-        dxi = np.zeros((2, n))
-        dxi[0, :] = dxu[0, :] * np.cos(theta) - projection_distance * dxu[1, :] * np.sin(theta)
-        dxi[1, :] = dxu[0, :] * np.sin(theta) + projection_distance * dxu[1, :] * np.cos(theta)
+        v, w = dxu[..., 0, :], dxu[..., 1, :]
+        dxi[..., 0, :] = v * cos - projection_distance * w * sin
+        dxi[..., 1, :] = v * sin + projection_distance * w * cos
 
         # Apply SI barrier
         dxi_safe = si_barrier(dxi, x_proj)
+        diagnostics = None
+        if isinstance(dxi_safe, tuple):
+            dxi_safe, diagnostics = dxi_safe
 
         # Convert back to unicycle
-        out = np.zeros((2, n))
-        for i in range(n):
-            c = np.cos(theta[i])
-            s = np.sin(theta[i])
-            out[0, i] = c * dxi_safe[0, i] + s * dxi_safe[1, i]
-            out[1, i] = (-s * dxi_safe[0, i] + c * dxi_safe[1, i]) / max(projection_distance, 1e-6)
+        if out is None:
+            out = np.empty(shape)
+        safe_x, safe_y = dxi_safe[..., 0, :], dxi_safe[..., 1, :]
+        out[..., 0, :] = cos * safe_x + sin * safe_y
+        out[..., 1, :] = (cos * safe_y - sin * safe_x) * inverse_distance
+        return out if diagnostics is None else (out, diagnostics)
+
+    barrier.si_barrier = si_barrier
+    barrier.neighbor_list = si_barrier.neighbor_list
+    return barrier
 
-        return out
 
-    return barrier
+def create_unicycle_barrier_certificate(
+    safety_radius: float = 0.15,
+    projection_distance: float = 0.05,
+    barrier_gain: float = 100.0,
+    magnitude_limit: float = 0.2,
+    neighbor_search: str = "auto",
+    neighbor_skin: float | None = None,
+    return_diagnostics: bool = False,
+):
+    """Unicycle barrier certificate (no boundary, matches Robotarium API).
+
+    Projects unicycle positions forward by projection_distance, applies
+    SI barrier, then returns corrected unicycle velocities.
+    """
+
+    si_barrier = create_single_integrator_barrier_certificate(
+        safety_radius=safety_radius,
+        barrier_gain=barrier_gain,
+        magnitude_limit=magnitude_limit,
+        neighbor_search=neighbor_search,
+        neighbor_skin=neighbor_skin,
+        return_diagnostics=return_diagnostics,
+    )
+    return _wrap_unicycle(si_barrier, projection_distance)
 
 
 def create_unicycle_barrier_certificate_with_boundary(
@@ -129,6 +849,10 @@ def create_unicycle_barrier_certificate_with_boundary(
     projection_distance: float = 0.05,
     boundary_margin: float = 0.05,
     magnitude_limit: float = 0.2,
+    neighbor_search: str = "auto",
+    neighbor_skin: float | None = None,
+    obstacles: ObstacleMap | None = None,
+    return_diagnostics: bool = False,
 ):
     """Unicycle barrier certificate with boundary (matches Robotarium API).
 
@@ -140,29 +864,9 @@ def create_unicycle_barrier_certificate_with_boundary(
         safety_radius=safety_radius,
         boundary_margin=boundary_margin,
         magnitude_limit=magnitude_limit,
+        neighbor_search=neighbor_search,
+        neighbor_skin=neighbor_skin,
+        obstacles=obstacles,
+        return_diagnostics=return_diagnostics,
     )
-
-    def barrier(dxu: np.ndarray, x: np.ndarray) -> np.ndarray:
-        n = x.shape[1]
-        theta = x[2, :]
-
-        x_proj = np.zeros((2, n))
-        x_proj[0, :] = x[0, :] + projection_distance * np.cos(theta)
-        x_proj[1, :] = x[1, :] + projection_distance * np.sin(theta)
-
-        dxi = np.zeros((2, n))
-        dxi[0, :] = dxu[0, :] * np.cos(theta) - projection_distance * dxu[1, :] * np.sin(theta)
-        dxi[1, :] = dxu[0, :] * np.sin(theta) + projection_distance * dxu[1, :] * np.cos(theta)
-
-        dxi_safe = si_barrier(dxi, x_proj)
-
-        out = np.zeros((2, n))
-        for i in range(n):
-            c = np.cos(theta[i])
-            s = np.sin(theta[i])
-            out[0, i] = c * dxi_safe[0, i] + s * dxi_safe[1, i]
-            out[1, i] = (-s * dxi_safe[0, i] + c * dxi_safe[1, i]) / max(projection_distance, 1e-6)
-
-        return out
-
-    return barrier
+    return _wrap_unicycle(si_barrier, projection_distance)
@@ -25,6 +25,16 @@ def create_si_position_controller(
     return controller
 
 
+def _heading_error(states: np.ndarray, targets: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Distance to each target and wrapped heading error towards it."""
+    dx = targets[..., 0, :] - states[..., 0, :]
+    dy = targets[..., 1, :] - states[..., 1, :]
+    dist = np.sqrt(dx**2 + dy**2)
+    heading_error = np.arctan2(dy, dx) - states[..., 2, :]
+    heading_error = (heading_error + np.pi) % (2 * np.pi) - np.pi
+    return dist, heading_error
+
+
 def create_clf_unicycle_position_controller(
     linear_velocity_gain: float = 0.8,
     angular_velocity_gain: float = 3.0,
@@ -33,30 +43,32 @@ def create_clf_unicycle_position_controller(
 ):
     """CLF-based unicycle position controller (matches Robotarium API).
 
-    Returns a function controller(states_3xN, targets_2xN) -> dxu_2xN.
+    Returns a function controller(states_3xN, targets_2xN, out=None) -> dxu_2xN,
+    computed for all robots in one array expression (a leading ensemble
+    dimension is allowed) and written into ``out`` when given.
     """
 
-    def controller(states: np.ndarray, targets: np.ndarray) -> np.ndarray:
-        n = states.shape[1]
-        dxu = np.zeros((2, n))
-
-        for i in range(n):
-            dx = targets[0, i] - states[0, i]
-            dy = targets[1, i] - states[1, i]
-            dist = np.sqrt(dx**2 + dy**2)
-
-            desired_heading = np.arctan2(dy, dx)
-            heading_error = desired_heading - states[2, i]
-            heading_error = (heading_error + np.pi) % (2 * np.pi) - np.pi
-
-            dxu[0, i] = linear_velocity_gain * dist * np.cos(heading_error)
-            dxu[1, i] = angular_velocity_gain * heading_error
+    def controller(
+        states: np.ndarray, targets: np.ndarray, out: np.ndarray | None = None
+    ) -> np.ndarray:
+        dist, heading_error = _heading_error(states, targets)
+        if out is None:
+            out = np.empty(dist.shape[:-1] + (2, dist.shape[-1]))
 
         # Velocity limiting
-        dxu[0, :] = np.clip(dxu[0, :], -velocity_magnitude_limit, velocity_magnitude_limit)
-        dxu[1, :] = np.clip(dxu[1, :], -angular_velocity_limit, angular_velocity_limit)
-
-        return dxu
+        np.clip(
+            linear_velocity_gain * dist * np.cos(heading_error),
+            -velocity_magnitude_limit,
+            velocity_magnitude_limit,
+            out=out[..., 0, :],
+        )
+        np.clip(
+            angular_velocity_gain * heading_error,
+            -angular_velocity_limit,
+            angular_velocity_limit,
+            out=out[..., 1, :],
+        )
+        return out
 
     return controller
 
@@ -70,34 +82,39 @@ def create_clf_unicycle_pose_controller(
 ):
     """CLF-based unicycle pose controller (position + heading, matches Robotarium API).
 
-    Returns a function controller(states_3xN, targets_3xN) -> dxu_2xN.
+    Returns a function controller(states_3xN, targets_3xN, out=None) -> dxu_2xN.
+    Robots farther than 2 cm from their target drive towards it; the rest
+    stop and turn to the target heading. Computed as one masked array
+    expression (a leading ensemble dimension is allowed), into ``out`` when
+    given.
     """
 
-    def controller(states: np.ndarray, targets: np.ndarray) -> np.ndarray:
-        n = states.shape[1]
-        dxu = np.zeros((2, n))
-
-        for i in range(n):
-            dx = targets[0, i] - states[0, i]
-            dy = targets[1, i] - states[1, i]
-            dist = np.sqrt(dx**2 + dy**2)
-
-            desired_heading = np.arctan2(dy, dx)
-            heading_error = desired_heading - states[2, i]
-            heading_error = (heading_error + np.pi) % (2 * np.pi) - np.pi
-
-            if dist > 0.02:
-                dxu[0, i] = linear_velocity_gain * dist * np.cos(heading_error)
-                dxu[1, i] = angular_velocity_gain * heading_error
-            else:
-                target_heading_error = targets[2, i] - states[2, i]
-                target_heading_error = (target_heading_error + np.pi) % (2 * np.pi) - np.pi
-                dxu[0, i] = 0.0
-                dxu[1, i] = rotation_error_gain * target_heading_error
-
-        dxu[0, :] = np.clip(dxu[0, :], -velocity_magnitude_limit, velocity_magnitude_limit)
-        dxu[1, :] = np.clip(dxu[1, :], -angular_velocity_limit, angular_velocity_limit)
-
-        return dxu
+    def controller(
+        states: np.ndarray, targets: np.ndarray, out: np.ndarray | None = None
+    ) -> np.ndarray:
+        dist, heading_error = _heading_error(states, targets)
+        target_heading_error = targets[..., 2, :] - states[..., 2, :]
+        target_heading_error = (target_heading_error + np.pi) % (2 * np.pi) - np.pi
+        driving = dist > 0.02
+        if out is None:
+            out = np.empty(dist.shape[:-1] + (2, dist.shape[-1]))
+
+        np.clip(
+            np.where(driving, linear_velocity_gain * dist * np.cos(heading_error), 0.0),
+            -velocity_magnitude_limit,
+            velocity_magnitude_limit,
+            out=out[..., 0, :],
+        )
+        np.clip(
+            np.where(
+                driving,
+                angular_velocity_gain * heading_error,
+                rotation_error_gain * target_heading_error,
+            ),
+            -angular_velocity_limit,
+            angular_velocity_limit,
+            out=out[..., 1, :],
+        )
+        return out
 
     return controller
@@ -4,71 +4,368 @@ from __future__ import annotations
 
 import numpy as np
 
+from .neighbors import ARENA_BOUNDS, NeighborList
+
 # ── Graph Laplacian utilities ───────────────────────────────────────────────
 
 
-def cycle_GL(n: int) -> np.ndarray:
-    """Return the graph Laplacian for a cycle graph on *n* vertices."""
+class GraphLaplacian:
+    """Graph Laplacian stored in CSR form, with a neighbor index per vertex.
+
+    ``indptr``/``indices``/``data`` hold the nonzeros of L row by row in
+    column order (every diagonal entry is stored, so no row is empty);
+    ``neighbor_indptr``/``neighbor_indices`` list, per vertex, the columns
+    with a negative entry, i.e. its topological neighbors in ascending
+    order. Memory is O(N + edges), so consensus and formation graphs on
+    thousands of robots stay small, and ``neighbors(i)`` is O(degree).
+
+    ``L @ X`` multiplies an (N,) or (N, k) array and ``X @ L`` a (k, N)
+    array such as stacked robot positions; ``toarray()`` (or
+    ``np.asarray(L)``) gives the dense matrix the other builders return.
+    """
+
+    # Make ``ndarray @ L`` defer to __rmatmul__ instead of densifying L.
+    __array_ufunc__ = None
+
+    def __init__(self, n: int, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray) -> None:
+        self.n = int(n)
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        rows = np.repeat(np.arange(self.n), np.diff(indptr))
+        link = (data < 0) & (indices != rows)
+        self.neighbor_indices = indices[link]
+        self.neighbor_indptr = np.zeros(self.n + 1, dtype=np.intp)
+        np.cumsum(np.bincount(rows[link], minlength=self.n), out=self.neighbor_indptr[1:])
+        self._rows = rows
+        for array in (self.indptr, self.indices, self.data, self.neighbor_indices):
+            array.flags.writeable = False
+
+    @classmethod
+    def from_edges(cls, n: int, i: np.ndarray, j: np.ndarray) -> GraphLaplacian:
+        """Unweighted Laplacian of the undirected edges (i[k], j[k]).
+
+        Repeated edges and self-loops are ignored.
+        """
+        i = np.asarray(i, dtype=np.int64)
+        j = np.asarray(j, dtype=np.int64)
+        keep = i != j
+        keys = np.unique(np.concatenate((i[keep] * n + j[keep], j[keep] * n + i[keep])))
+        degree = np.bincount(keys // n, minlength=n).astype(float)
+        diagonal = np.arange(n, dtype=np.int64) * (n + 1)
+        keys = np.concatenate((keys, diagonal))
+        data = np.concatenate((np.full(keys.size - n, -1.0), degree))
+        order = np.argsort(keys, kind="stable")
+        return cls._from_keys(n, keys[order], data[order])
+
+    @classmethod
+    def from_dense(cls, L: np.ndarray) -> GraphLaplacian:
+        """CSR copy of a dense (possibly weighted) Laplacian."""
+        L = np.asarray(L, dtype=float)
+        n = L.shape[0]
+        mask = L != 0
+        mask[np.diag_indices(n)] = True
+        rows, cols = np.nonzero(mask)
+        return cls._from_keys(n, rows.astype(np.int64) * n + cols, L[rows, cols])
+
+    @classmethod
+    def _from_keys(cls, n: int, keys: np.ndarray, data: np.ndarray) -> GraphLaplacian:
+        # keys = row * n + col, sorted; every row holds at least its diagonal.
+        indptr = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(np.bincount(keys // n, minlength=n), out=indptr[1:])
+        return cls(n, indptr, (keys % n).astype(np.intp), data)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return (self.n, self.n)
+
+    @property
+    def nnz(self) -> int:
+        return int(self.data.size)
+
+    @property
+    def degree(self) -> np.ndarray:
+        """Number of topological neighbors of each vertex."""
+        return np.diff(self.neighbor_indptr)
+
+    def neighbors(self, agent: int) -> np.ndarray:
+        """Topological neighbors of ``agent`` (read-only view, ascending)."""
+        return self.neighbor_indices[self.neighbor_indptr[agent] : self.neighbor_indptr[agent + 1]]
+
+    def edges(self) -> tuple[np.ndarray, np.ndarray]:
+        """Endpoint arrays (i, j), i < j, of every edge."""
+        rows = np.repeat(np.arange(self.n), self.degree)
+        upper = rows < self.neighbor_indices
+        return rows[upper], self.neighbor_indices[upper]
+
+    def _matvec(self, v: np.ndarray) -> np.ndarray:
+        return np.add.reduceat(self.data * v[self.indices], self.indptr[:-1])
+
+    def dot(self, x: np.ndarray) -> np.ndarray:
+        """L @ x for x of shape (N,) or (N, k)."""
+        x = np.asarray(x, dtype=float)
+        if x.ndim == 1:
+            return self._matvec(x)
+        return np.stack([self._matvec(column) for column in x.T], axis=1)
+
+    def __matmul__(self, x: np.ndarray) -> np.ndarray:
+        return self.dot(x)
+
+    def __rmatmul__(self, x: np.ndarray) -> np.ndarray:
+        # x @ L for (k, N) x: L is symmetric, so each row is L @ row.
+        x = np.asarray(x, dtype=float)
+        if x.ndim == 1:
+            return self._matvec(x)
+        return np.stack([self._matvec(row) for row in x])
+
+    def toarray(self) -> np.ndarray:
+        L = np.zeros((self.n, self.n))
+        L[self._rows, self.indices] = self.data
+        return L
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        L = self.toarray()
+        return L if dtype is None else L.astype(dtype)
+
+    def __repr__(self) -> str:
+        return f"GraphLaplacian(n={self.n}, edges={self.neighbor_indices.size // 2})"
+
+
+def cycle_GL(n: int, sparse: bool = False) -> np.ndarray | GraphLaplacian:
+    """Return the graph Laplacian for a cycle graph on *n* vertices.
+
+    With ``sparse=True`` a GraphLaplacian (CSR) is returned instead.
+    """
+    i = np.arange(n)
+    if sparse and n >= 3:
+        return GraphLaplacian.from_edges(n, i, (i + 1) % n)
     L = np.zeros((n, n))
-    for i in range(n):
-        L[i, i] = 2
-        L[i, (i + 1) % n] = -1
-        L[i, (i - 1) % n] = -1
-    return L
+    L[i, i] = 2
+    L[i, (i + 1) % n] = -1
+    L[i, (i - 1) % n] = -1
+    return GraphLaplacian.from_dense(L) if sparse else L
+
 
+def lineGL(n: int, sparse: bool = False) -> np.ndarray | GraphLaplacian:
+    """Return the graph Laplacian for a line/path graph on *n* vertices.
 
-def lineGL(n: int) -> np.ndarray:
-    """Return the graph Laplacian for a line/path graph on *n* vertices."""
+    With ``sparse=True`` a GraphLaplacian (CSR) is returned instead.
+    """
+    i = np.arange(n - 1)
+    if sparse:
+        return GraphLaplacian.from_edges(n, i, i + 1)
     L = np.zeros((n, n))
-    for i in range(n):
-        if i > 0:
-            L[i, i] += 1
-            L[i, i - 1] = -1
-        if i < n - 1:
-            L[i, i] += 1
-            L[i, i + 1] = -1
+    L[i, i + 1] = -1
+    L[i + 1, i] = -1
+    L[np.diag_indices(n)] = np.bincount(np.concatenate((i, i + 1)), minlength=n)
     return L
 
 
-def completeGL(n: int) -> np.ndarray:
-    """Return the graph Laplacian for the complete graph K_n."""
+def completeGL(n: int, sparse: bool = False) -> np.ndarray | GraphLaplacian:
+    """Return the graph Laplacian for the complete graph K_n.
+
+    With ``sparse=True`` a GraphLaplacian (CSR) is returned instead; it
+    still holds all n^2 entries, so it only pays off for neighbor lookups.
+    """
+    if sparse:
+        return GraphLaplacian.from_edges(n, *np.triu_indices(n, k=1))
     L = n * np.eye(n) - np.ones((n, n))
     return L
 
 
-def random_connectedGL(n: int, edge_probability: float = 0.5) -> np.ndarray:
+def _random_extra_edges(
+    n: int, edge_probability: float, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """Each pair (i, j) with j >= i + 2 independently with edge_probability.
+
+    Draws the edge count from the binomial and then that many distinct
+    pairs, which has the same distribution as one draw per pair but costs
+    O(N + edges) instead of O(N^2).
+    """
+    # Row i holds the pairs (i, i + 2) ... (i, n - 1); start[i] is its offset.
+    lengths = np.maximum(n - 2 - np.arange(n), 0)
+    start = np.concatenate(([0], np.cumsum(lengths)))
+    total = int(start[-1])
+    count = rng.binomial(total, edge_probability) if total else 0
+    k = np.sort(rng.choice(total, size=count, replace=False)) if count else np.empty(0, int)
+    i = np.searchsorted(start, k, side="right") - 1
+    return i, k - start[i] + i + 2
+
+
+def random_connectedGL(
+    n: int,
+    edge_probability: float = 0.5,
+    sparse: bool = False,
+    seed: int | np.random.Generator | None = None,
+) -> np.ndarray | GraphLaplacian:
     """Return a graph Laplacian for a random connected graph.
 
-    Starts with a spanning tree (path) and adds random edges.
+    Starts with a spanning tree (path) and adds random edges. ``seed``
+    makes the graph reproducible; ``sparse=True`` returns a GraphLaplacian
+    (CSR) without ever forming the dense matrix.
     """
-    A = np.zeros((n, n))
-    # Spanning tree (path)
-    for i in range(n - 1):
-        A[i, i + 1] = 1
-        A[i + 1, i] = 1
-
-    # Random additional edges
-    rng = np.random.default_rng()
-    for i in range(n):
-        for j in range(i + 2, n):
-            if rng.random() < edge_probability:
-                A[i, j] = 1
-                A[j, i] = 1
+    rng = np.random.default_rng(seed)
+    path = np.arange(n - 1)
+    extra_i, extra_j = _random_extra_edges(n, edge_probability, rng)
+    i = np.concatenate((path, extra_i))
+    j = np.concatenate((path + 1, extra_j))
+    if sparse:
+        return GraphLaplacian.from_edges(n, i, j)
 
+    A = np.zeros((n, n))
+    A[i, j] = 1
+    A[j, i] = 1
     D = np.diag(A.sum(axis=1))
     return D - A
 
 
-def topological_neighbors(L: np.ndarray, agent: int) -> np.ndarray:
-    """Return the topological neighbors of *agent* given graph Laplacian *L*."""
+def topological_neighbors(L: np.ndarray | GraphLaplacian, agent: int) -> np.ndarray:
+    """Return the topological neighbors of *agent* given graph Laplacian *L*.
+
+    For a GraphLaplacian this reads the precomputed neighbor index, O(degree).
+    """
+    if isinstance(L, GraphLaplacian):
+        return L.neighbors(agent)
     row = L[agent, :]
     neighbors = np.where((row < 0))[0]
     return neighbors
 
 
+# ── Proximity graphs ────────────────────────────────────────────────────────
+
+
+class ProximityGraph:
+    """Delta-disk graph (edge iff distance < ``radius``) kept up to date across steps.
+
+    Call ``update(xy)`` once per step with the 2xN positions. Candidate pairs
+    come from a Verlet NeighborList (``radius`` plus ``skin``) on the spatial
+    hash, so a step costs O(N + candidates) and the grid is rebuilt only
+    after some robot has moved more than ``skin / 2``. The edge set is
+    compared with the previous step's, and the edges that appeared and
+    disappeared are returned as events. The graph is exactly what a dense
+    ``np.linalg.norm(diff, axis=0) < radius`` adjacency gives, without ever
+    forming an NxN array::
+
+        graph = ProximityGraph(COMM_RADIUS)
+        graph.update(pos)
+        vitals -= CONSENSUS_EPS * graph.laplacian_dot(vitals)
+
+    ``i``/``j`` hold the current edges (i < j, sorted), ``degree`` the
+    neighbor counts; ``neighbor_list`` and ``report()`` give the statistics.
+    """
+
+    def __init__(self, radius: float, skin: float = 0.1, bounds=ARENA_BOUNDS) -> None:
+        self.radius = float(radius)
+        self.neighbor_list = NeighborList(self.radius, skin, bounds=bounds)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the graph; the next update reports every edge as added."""
+        empty = np.empty(0, dtype=np.intp)
+        self.n = 0
+        self.i = self.j = empty
+        self.degree = empty
+        self.added = self.removed = (empty, empty)
+        self.updates = 0
+        self.added_total = 0
+        self.removed_total = 0
+        self._keys = np.empty(0, dtype=np.int64)
+        self._laplacian: GraphLaplacian | None = None
+        self.neighbor_list.reset()
+
+    def update(
+        self, xy: np.ndarray
+    ) -> tuple[tuple[np.ndarray, np.ndarray], tuple[np.ndarray, np.ndarray]]:
+        """Recompute the edges for positions ``xy`` (2xN or 3xN).
+
+        Returns ``(added, removed)``, each an (i, j) pair of index arrays
+        (i < j) of the edges that appeared or disappeared since the last
+        update. A change in N counts every old edge as removed.
+        """
+        xy = np.asarray(xy, dtype=float)[:2]
+        n = xy.shape[1]
+        old_n, old_keys = self.n, self._keys
+
+        i, j = self.neighbor_list.pairs(xy)
+        diff = xy[:, i] - xy[:, j]
+        close = np.sqrt(diff[0] * diff[0] + diff[1] * diff[1]) < self.radius
+        keys = np.sort(i[close].astype(np.int64) * n + j[close])
+
+        if n == old_n:
+            added = np.setdiff1d(keys, old_keys, assume_unique=True)
+            removed = np.setdiff1d(old_keys, keys, assume_unique=True)
+        else:
+            # Old keys are numbered for old_n robots; renumbering is meaningless.
+            added, removed = keys, old_keys
+        self.added = ((added // n).astype(np.intp), (added % n).astype(np.intp))
+        self.removed = (
+            (removed // max(old_n, 1)).astype(np.intp),
+            (removed % max(old_n, 1)).astype(np.intp),
+        )
+
+        self.n = n
+        self._keys = keys
+        self.i = (keys // n).astype(np.intp)
+        self.j = (keys % n).astype(np.intp)
+        self.degree = np.bincount(np.concatenate((self.i, self.j)), minlength=n)
+        self._laplacian = None
+        self.updates += 1
+        self.added_total += added.size
+        self.removed_total += removed.size
+        return self.added, self.removed
+
+    __call__ = update
+
+    @property
+    def edge_count(self) -> int:
+        return int(self._keys.size)
+
+    def laplacian_dot(self, values: np.ndarray) -> np.ndarray:
+        """L @ values for (N,) values, or per row of a (k, N) array, in O(N + edges).
+
+        Row r of the result is sum over neighbors j of (v_r - v_j), so the
+        consensus update is ``values - eps * graph.laplacian_dot(values)``.
+        """
+        values = np.asarray(values, dtype=float)
+        if values.ndim > 1:
+            return np.stack([self.laplacian_dot(row) for row in values])
+        incoming = np.bincount(self.i, weights=values[self.j], minlength=self.n)
+        incoming += np.bincount(self.j, weights=values[self.i], minlength=self.n)
+        return self.degree * values - incoming
+
+    def laplacian(self) -> GraphLaplacian:
+        """The current graph as a GraphLaplacian (built once per update)."""
+        if self._laplacian is None:
+            self._laplacian = GraphLaplacian.from_edges(self.n, self.i, self.j)
+        return self._laplacian
+
+    def neighbors(self, agent: int) -> np.ndarray:
+        """Current neighbors of ``agent`` (ascending)."""
+        return self.laplacian().neighbors(agent)
+
+    def report(self) -> dict:
+        """Update count, current edges, edge event totals and neighbor-list rebuilds."""
+        return {
+            "updates": self.updates,
+            "edges": self.edge_count,
+            "added": self.added_total,
+            "removed": self.removed_total,
+            "rebuilds": self.neighbor_list.rebuilds,
+            "rebuild_rate": self.neighbor_list.rebuild_rate,
+            "radius": self.radius,
+            "skin": self.neighbor_list.skin,
+        }
+
+
 # ── Convergence checkers ────────────────────────────────────────────────────
 
 
+def _position_error(states: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    dx = states[..., 0, :] - targets[..., 0, :]
+    dy = states[..., 1, :] - targets[..., 1, :]
+    return np.sqrt(dx * dx + dy * dy)
+
+
 def at_pose(
     states: np.ndarray,
     targets: np.ndarray,
@@ -77,15 +374,11 @@ def at_pose(
 ) -> np.ndarray:
     """Check which robots are at their target pose (position + heading).
 
-    Returns a 1D boolean array of length N.
+    Returns a 1D boolean array of length N (one row per replica for
+    (B, 3, N) inputs).
     """
-    n = states.shape[1]
-    close = np.zeros(n, dtype=bool)
-    for i in range(n):
-        pos_err = np.linalg.norm(states[:2, i] - targets[:2, i])
-        rot_err = abs(((states[2, i] - targets[2, i]) + np.pi) % (2 * np.pi) - np.pi)
-        close[i] = pos_err < position_error and rot_err < rotation_error
-    return close
+    rot_err = np.abs((states[..., 2, :] - targets[..., 2, :] + np.pi) % (2 * np.pi) - np.pi)
+    return (_position_error(states, targets) < position_error) & (rot_err < rotation_error)
 
 
 def at_position(
@@ -95,13 +388,129 @@ def at_position(
 ) -> np.ndarray:
     """Check which robots are at their target position (ignoring heading).
 
-    Returns a 1D boolean array of length N.
+    Returns a 1D boolean array of length N (one row per replica for
+    (B, ., N) inputs).
+    """
+    return _position_error(states, targets) < position_error
+
+
+class ArrivalTracker:
+    """Per-robot arrival state for N robots heading to targets, updated once per step.
+
+    ``update(positions, targets, t)`` compares every robot with its target
+    in one array operation. A robot *arrives* when it comes closer than
+    ``radius`` and stays arrived until it is ``radius + hysteresis`` or
+    more away, so jitter around the threshold does not toggle the state.
+    ``t`` is the time in seconds; if it is omitted the tracker's own clock
+    advances by ``time_step`` per update.
+
+    After each update:
+
+    - ``arrived``: robots currently within range;
+    - ``just_arrived`` / ``just_left``: the transitions of this update;
+    - ``first_arrival``: time of each robot's first arrival (NaN until then);
+    - ``dwell``: seconds since the current stay began (0 when away);
+    - ``dwelled``: arrived robots whose stay has reached ``dwell_time``;
+    - ``arrivals``: number of arrivals per robot.
+
+    This replaces scalar FSM checks such as
+    ``np.linalg.norm(n_pos - target) < 0.12`` or Run08's ``doc_dwell_t``
+    bookkeeping. Call ``reset(robots)`` when those robots get a new target.
+    ``radius`` may be a scalar or an (N,) array and can be overridden per
+    update, e.g. a looser radius at via points.
     """
-    n = states.shape[1]
-    close = np.zeros(n, dtype=bool)
-    for i in range(n):
-        close[i] = np.linalg.norm(states[:2, i] - targets[:2, i]) < position_error
-    return close
+
+    def __init__(
+        self,
+        radius: float | np.ndarray = 0.12,
+        hysteresis: float = 0.0,
+        dwell_time: float = 0.0,
+        time_step: float = 0.033,
+    ) -> None:
+        if hysteresis < 0:
+            raise ValueError("hysteresis must be non-negative")
+        self.radius = radius
+        self.hysteresis = float(hysteresis)
+        self.dwell_time = float(dwell_time)
+        self.time_step = float(time_step)
+        self.n = 0
+        self.time = -self.time_step
+        self.updates = 0
+        self._allocate(0)
+
+    def _allocate(self, n: int) -> None:
+        self.n = n
+        self.distance = np.full(n, np.inf)
+        self.arrived = np.zeros(n, dtype=bool)
+        self.just_arrived = np.zeros(n, dtype=bool)
+        self.just_left = np.zeros(n, dtype=bool)
+        self.dwelled = np.zeros(n, dtype=bool)
+        self.first_arrival = np.full(n, np.nan)
+        self.entered_at = np.full(n, np.nan)
+        self.dwell = np.zeros(n)
+        self.arrivals = np.zeros(n, dtype=np.int64)
+
+    def reset(self, robots=None) -> None:
+        """Mark ``robots`` (indices or mask; default all) as away, e.g. on a new target.
+
+        Their current stay ends without a ``just_left`` event; first-arrival
+        times and arrival counts are kept.
+        """
+        robots = slice(None) if robots is None else robots
+        self.arrived[robots] = False
+        self.dwelled[robots] = False
+        self.entered_at[robots] = np.nan
+        self.dwell[robots] = 0.0
+
+    def update(
+        self,
+        positions: np.ndarray,
+        targets: np.ndarray,
+        t: float | None = None,
+        radius: float | np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Advance to time ``t`` with 2xN (or 3xN) ``positions`` and 2xN ``targets``.
+
+        Returns the ``arrived`` mask.
+        """
+        n = positions.shape[-1]
+        if n != self.n:
+            self._allocate(n)
+        self.time = self.time + self.time_step if t is None else float(t)
+        radius = self.radius if radius is None else radius
+
+        distance = _position_error(positions, targets)
+        entering = ~self.arrived & (distance < radius)
+        leaving = self.arrived & (distance >= np.add(radius, self.hysteresis))
+        self.arrived ^= entering | leaving
+
+        self.just_arrived = entering
+        self.just_left = leaving
+        self.distance = distance
+        self.entered_at[entering] = self.time
+        self.entered_at[leaving] = np.nan
+        np.copyto(self.first_arrival, self.time, where=entering & np.isnan(self.first_arrival))
+        self.arrivals += entering
+        np.subtract(self.time, self.entered_at, out=self.dwell)
+        self.dwell[~self.arrived] = 0.0
+        self.dwelled = self.arrived & (self.dwell >= self.dwell_time)
+        self.updates += 1
+        return self.arrived
+
+    __call__ = update
+
+    def report(self) -> dict:
+        """Arrival counts and first-arrival time statistics in seconds."""
+        reached = self.first_arrival[~np.isnan(self.first_arrival)]
+        return {
+            "updates": self.updates,
+            "robots": self.n,
+            "arrived": int(self.arrived.sum()),
+            "ever_arrived": int(reached.size),
+            "arrivals": int(self.arrivals.sum()),
+            "first_arrival_mean": float(reached.mean()) if reached.size else float("nan"),
+            "first_arrival_max": float(reached.max()) if reached.size else float("nan"),
+        }
 
 
 def determine_marker_size(robotarium, marker_size_meters: float = 0.08) -> float:
@@ -0,0 +1,170 @@
+"""Neighbor search for pairwise interactions (barrier certificates, graphs).
+
+Robots only interact with others closer than a cutoff (the barrier safety
+radius, a communication radius), so examining all N^2 pairs is wasted work
+for any sizeable swarm. The uniform-grid spatial hash below buckets robots
+into square cells of side ``cell_size`` anchored at the arena corner; every
+pair closer than ``cell_size`` then lies in the same or an adjacent cell, and
+candidate pairs are generated in O(N log N) (a sort) plus O(pairs).
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+# Standard Robotarium arena [x_min, x_max, y_min, y_max] in metres.
+ARENA_BOUNDS = (-1.6, 1.6, -1.0, 1.0)
+
+
+def _expand_ranges(starts: np.ndarray, stops: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Flatten half-open ranges into (range id, position) index arrays."""
+    counts = np.maximum(stops - starts, 0)
+    total = int(counts.sum())
+    owner = np.repeat(np.arange(starts.size), counts)
+    offsets = np.cumsum(counts) - counts
+    position = np.arange(total) - np.repeat(offsets, counts) + np.repeat(starts, counts)
+    return owner, position
+
+
+def create_spatial_hash(cell_size: float, bounds=ARENA_BOUNDS):
+    """Uniform-grid spatial hash over the arena.
+
+    Returns a function neighbors(xy_2xN, labels=None) -> (i, j) giving every
+    candidate pair i < j whose cells touch. All pairs closer than
+    ``cell_size`` are included (farther ones may be too; callers filter by
+    distance). Points outside ``bounds`` are hashed into cells beyond the
+    arena rather than clamped, so projected or stray positions stay exact.
+    ``labels`` (length N ints) restricts pairs to points with equal labels,
+    e.g. robots of the same replica in an ensemble.
+    """
+    if cell_size <= 0:
+        raise ValueError("cell_size must be positive")
+    x_min, _, y_min, _ = bounds
+
+    def neighbors(
+        xy: np.ndarray, labels: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        n = xy.shape[1]
+        if n < 2:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        cx = np.floor((xy[0] - x_min) / cell_size).astype(np.int64)
+        cy = np.floor((xy[1] - y_min) / cell_size).astype(np.int64)
+        # One padding cell on each side keeps neighbor keys from wrapping rows.
+        cx -= cx.min() - 1
+        cy -= cy.min() - 1
+        cols = int(cx.max()) + 2
+        rows = int(cy.max()) + 2
+        keys = cy * cols + cx
+        if labels is not None:
+            keys += np.asarray(labels, dtype=np.int64) * (rows * cols)
+
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        slot = np.arange(n)
+
+        # Same cell: only later points, so each pair appears once.
+        starts = [slot + 1]
+        stops = [np.searchsorted(sorted_keys, sorted_keys, side="right")]
+        # Half stencil of forward cells: east, north-west, north, north-east.
+        for offset in (1, cols - 1, cols, cols + 1):
+            target = sorted_keys + offset
+            starts.append(np.searchsorted(sorted_keys, target, side="left"))
+            stops.append(np.searchsorted(sorted_keys, target, side="right"))
+
+        range_id, position = _expand_ranges(np.concatenate(starts), np.concatenate(stops))
+        a = order[range_id % n]
+        b = order[position]
+        return np.minimum(a, b), np.maximum(a, b)
+
+    return neighbors
+
+
+class NeighborList:
+    """Verlet neighbor list: candidate pairs kept across calls until stale.
+
+    ``pairs(xy)`` returns every pair i < j closer than ``cutoff`` (plus some
+    within ``cutoff + skin``). The list holds all pairs within
+    ``cutoff + skin`` of the positions at the last rebuild and is rebuilt
+    only once some point has moved more than ``skin / 2`` since then, or the
+    point count changes; until that happens no pair can have closed from
+    beyond ``cutoff + skin`` to within ``cutoff``. Robots move at most a few
+    millimetres per step, so rebuilds are rare and pair generation is
+    amortized O(N).
+
+    ``candidates`` maps a 2xN position array to candidate (i, j) arrays with
+    i < j for the rebuild (default: a spatial hash with cells of
+    ``cutoff + skin``); the rebuild keeps those within ``cutoff + skin``.
+    ``calls``, ``rebuilds`` and ``report()`` give the rebuild statistics.
+    """
+
+    def __init__(self, cutoff: float, skin: float, candidates=None, bounds=ARENA_BOUNDS) -> None:
+        if cutoff <= 0:
+            raise ValueError("cutoff must be positive")
+        if skin < 0:
+            raise ValueError("skin must be non-negative")
+        self.cutoff = float(cutoff)
+        self.skin = float(skin)
+        self.list_radius = self.cutoff + self.skin
+        self._candidates = candidates or create_spatial_hash(self.list_radius, bounds)
+        self.calls = 0
+        self.rebuilds = 0
+        self._reference: np.ndarray | None = None
+        self._labels: np.ndarray | None = None
+        self._pairs: tuple[np.ndarray, np.ndarray] | None = None
+
+    def reset(self) -> None:
+        """Drop the current list so the next call rebuilds it."""
+        self._reference = None
+        self._labels = None
+        self._pairs = None
+
+    def _stale(self, xy: np.ndarray, labels: np.ndarray | None) -> bool:
+        if self._reference is None or self._reference.shape != xy.shape:
+            return True
+        if labels is not self._labels and (
+            labels is None or self._labels is None or not np.array_equal(labels, self._labels)
+        ):
+            return True
+        moved = xy - self._reference
+        limit = 0.5 * self.skin
+        return bool(np.any(moved[0] * moved[0] + moved[1] * moved[1] > limit * limit))
+
+    def pairs(
+        self, xy: np.ndarray, labels: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Candidate pairs (i, j), i < j, covering every pair closer than cutoff.
+
+        ``labels`` is passed on to ``candidates`` (pairs only within equal
+        labels, as for create_spatial_hash); changing it forces a rebuild.
+        """
+        xy = np.asarray(xy, dtype=float)[:2]
+        self.calls += 1
+        if self._stale(xy, labels):
+            i, j = self._candidates(xy) if labels is None else self._candidates(xy, labels)
+            diff = xy[:, i] - xy[:, j]
+            keep = diff[0] * diff[0] + diff[1] * diff[1] <= self.list_radius * self.list_radius
+            self._pairs = (i[keep], j[keep])
+            self._reference = xy.copy()
+            self._labels = labels
+            self.rebuilds += 1
+        return self._pairs
+
+    __call__ = pairs
+
+    @property
+    def rebuild_rate(self) -> float:
+        """Fraction of calls that rebuilt the list."""
+        return self.rebuilds / self.calls if self.calls else 0.0
+
+    def report(self) -> dict:
+        """Call/rebuild counts, rebuild rate and current list size."""
+        return {
+            "calls": self.calls,
+            "rebuilds": self.rebuilds,
+            "rebuild_rate": self.rebuild_rate,
+            "mean_steps_per_rebuild": self.calls / self.rebuilds if self.rebuilds else 0.0,
+            "pairs": 0 if self._pairs is None else int(self._pairs[0].size),
+            "cutoff": self.cutoff,
+            "skin": self.skin,
+        }
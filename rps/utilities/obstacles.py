@@ -0,0 +1,187 @@
+"""Static obstacle maps rasterized into a signed-distance grid.
+
+Ward layouts (beds, counters, aisles) are described once as rectangles,
+circles and polygons; ``ObstacleMap`` samples the signed distance to the
+nearest obstacle surface (and the arena walls) on a uniform grid together
+with its gradient. Each query is then a vectorized bilinear lookup, O(N) in
+the robots regardless of how many primitives the layout has, which is what
+the barrier certificates and potential-field terms need every step.
+
+Sign convention: distance is positive in free space, zero on an obstacle
+surface and negative inside an obstacle (or outside the arena walls); the
+gradient points away from the nearest obstacle.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from .neighbors import ARENA_BOUNDS
+
+
+def _rectangle_distance(px, py, x_min, x_max, y_min, y_max):
+    cx, cy = 0.5 * (x_min + x_max), 0.5 * (y_min + y_max)
+    qx = np.abs(px - cx) - 0.5 * (x_max - x_min)
+    qy = np.abs(py - cy) - 0.5 * (y_max - y_min)
+    outside = np.hypot(np.maximum(qx, 0.0), np.maximum(qy, 0.0))
+    return outside + np.minimum(np.maximum(qx, qy), 0.0)
+
+
+def _polygon_distance(px, py, vertices: np.ndarray):
+    distance = np.full(px.shape, np.inf)
+    inside = np.zeros(px.shape, dtype=bool)
+    for (ax, ay), (bx, by) in zip(vertices, np.roll(vertices, -1, axis=0)):
+        ex, ey = bx - ax, by - ay
+        t = np.clip(((px - ax) * ex + (py - ay) * ey) / (ex * ex + ey * ey), 0.0, 1.0)
+        np.minimum(distance, np.hypot(px - ax - t * ex, py - ay - t * ey), out=distance)
+        # Even-odd rule: count edges crossed by a ray towards +x.
+        spans = (ay > py) != (by > py)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing = ax + ex * (py - ay) / ey
+        inside ^= spans & (px < crossing)
+    return np.where(inside, -distance, distance)
+
+
+class ObstacleMap:
+    """Rectangles, circles and polygons rasterized into a signed-distance grid.
+
+    ``bounds`` [x_min, x_max, y_min, y_max] is the arena; with ``walls`` the
+    arena edges count as obstacles, so the map replaces the hard-coded
+    boundary rectangle. The grid has spacing ``resolution`` and extends
+    ``padding`` beyond the arena so projected points slightly outside are
+    still looked up accurately; queries farther out are clamped to the grid.
+
+    Primitives may be added at any time; the grid is (re)built lazily on the
+    next query or explicitly with ``build()``. Add methods return the map so
+    layouts can be chained::
+
+        ward = ObstacleMap().add_rectangle(-0.2, 0.2, -1.0, -0.4).add_circle((1.0, 0.5), 0.1)
+        d, normal = ward.query(x[:2])
+    """
+
+    def __init__(
+        self,
+        bounds=ARENA_BOUNDS,
+        resolution: float = 0.01,
+        walls: bool = True,
+        padding: float = 0.1,
+    ) -> None:
+        if resolution <= 0:
+            raise ValueError("resolution must be positive")
+        self.bounds = tuple(float(b) for b in bounds)
+        self.resolution = float(resolution)
+        self.walls = bool(walls)
+        self.padding = float(padding)
+        self._primitives: list[tuple] = []
+        self._field: np.ndarray | None = None
+
+    # ── layout ─────────────────────────────────────────────────────────
+
+    def add_rectangle(self, x_min: float, x_max: float, y_min: float, y_max: float) -> ObstacleMap:
+        """Axis-aligned rectangle [x_min, x_max] x [y_min, y_max]."""
+        if x_max <= x_min or y_max <= y_min:
+            raise ValueError("rectangle must have x_max > x_min and y_max > y_min")
+        self._primitives.append(
+            ("rectangle", float(x_min), float(x_max), float(y_min), float(y_max))
+        )
+        self._field = None
+        return self
+
+    def add_circle(self, center, radius: float) -> ObstacleMap:
+        """Disc of ``radius`` around ``center`` (x, y)."""
+        if radius <= 0:
+            raise ValueError("radius must be positive")
+        cx, cy = center
+        self._primitives.append(("circle", float(cx), float(cy), float(radius)))
+        self._field = None
+        return self
+
+    def add_polygon(self, vertices) -> ObstacleMap:
+        """Simple polygon given by its (K, 2) vertices in order (K >= 3)."""
+        vertices = np.array(vertices, dtype=float)
+        if vertices.ndim != 2 or vertices.shape[1] != 2 or len(vertices) < 3:
+            raise ValueError("vertices must be a (K, 2) array with K >= 3")
+        self._primitives.append(("polygon", vertices))
+        self._field = None
+        return self
+
+    def __len__(self) -> int:
+        return len(self._primitives)
+
+    # ── rasterization ──────────────────────────────────────────────────
+
+    def _exact_distance(self, px: np.ndarray, py: np.ndarray) -> np.ndarray:
+        distance = np.full(px.shape, np.inf)
+        if self.walls:
+            x_min, x_max, y_min, y_max = self.bounds
+            distance = np.minimum.reduce([px - x_min, x_max - px, py - y_min, y_max - py])
+        for kind, *params in self._primitives:
+            if kind == "rectangle":
+                d = _rectangle_distance(px, py, *params)
+            elif kind == "circle":
+                cx, cy, radius = params
+                d = np.hypot(px - cx, py - cy) - radius
+            else:
+                d = _polygon_distance(px, py, params[0])
+            np.minimum(distance, d, out=distance)
+        return distance
+
+    def build(self) -> ObstacleMap:
+        """Sample distance and gradient on the grid (done once per layout)."""
+        x_min, x_max, y_min, y_max = self.bounds
+        h = self.resolution
+        self._origin = (x_min - self.padding, y_min - self.padding)
+        nx = int(np.ceil((x_max - x_min + 2 * self.padding) / h)) + 1
+        ny = int(np.ceil((y_max - y_min + 2 * self.padding) / h)) + 1
+        px, py = np.meshgrid(
+            self._origin[0] + h * np.arange(nx), self._origin[1] + h * np.arange(ny)
+        )
+        distance = self._exact_distance(px, py)
+        # With no walls and no primitives every node is infinitely far away.
+        distance = np.where(np.isfinite(distance), distance, np.finfo(float).max / 4)
+        grad_y, grad_x = np.gradient(distance, h)
+        self._field = np.stack([distance, grad_x, grad_y])
+        return self
+
+    # ── queries ────────────────────────────────────────────────────────
+
+    def _interpolate(self, xy: np.ndarray) -> np.ndarray:
+        if self._field is None:
+            self.build()
+        _, ny, nx = self._field.shape
+        fx = (np.asarray(xy[0], dtype=float) - self._origin[0]) / self.resolution
+        fy = (np.asarray(xy[1], dtype=float) - self._origin[1]) / self.resolution
+        ix = np.clip(np.floor(fx).astype(np.intp), 0, nx - 2)
+        iy = np.clip(np.floor(fy).astype(np.intp), 0, ny - 2)
+        tx = np.clip(fx - ix, 0.0, 1.0)
+        ty = np.clip(fy - iy, 0.0, 1.0)
+        field = self._field
+        bottom = field[:, iy, ix] * (1.0 - tx) + field[:, iy, ix + 1] * tx
+        top = field[:, iy + 1, ix] * (1.0 - tx) + field[:, iy + 1, ix + 1] * tx
+        return bottom * (1.0 - ty) + top * ty
+
+    def distance(self, xy: np.ndarray) -> np.ndarray:
+        """Signed distance (N,) from each point of ``xy`` (2xN) to the nearest obstacle."""
+        return self._interpolate(xy)[0]
+
+    def query(self, xy: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Signed distance (N,) and unit outward normal (2xN) at each point.
+
+        The normal is the normalised distance gradient, i.e. the direction
+        that increases clearance fastest.
+        """
+        field = self._interpolate(xy)
+        gradient = field[1:]
+        norm = np.hypot(gradient[0], gradient[1])
+        return field[0], gradient / np.maximum(norm, 1e-12)
+
+    def repulsion(self, xy: np.ndarray, gain: float, min_distance: float) -> np.ndarray:
+        """Inverse-square push (2xN) away from the nearest obstacle.
+
+        Magnitude ``gain / max(d, min_distance)**2`` along the outward
+        normal, the form of the hand-written wall terms in the potential-field
+        scripts (e.g. Run08's WALL_GAIN / WALL_R), but covering every
+        obstacle of the layout with one lookup.
+        """
+        distance, normal = self.query(xy)
+        return normal * (gain / np.maximum(distance, min_distance) ** 2)
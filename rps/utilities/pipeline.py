@@ -0,0 +1,183 @@
+"""Fused per-step safety pipeline for experiment loops.
+
+Every 10Runs script ends its control step with the same chain:
+
+    dxi = si_barrier(dxi, x)                       # pairwise push + arena walls
+    dxu = si_to_uni(dxi, x)                        # heading-tracking [v; w]
+    dxu[:, norm(dxi) < 1e-4] = 0.0                 # no spinning in place
+    dxu = wheel_safe(dxu)                          # derate clamp + wheel budget
+
+``create_safety_pipeline`` runs that chain in one call. After the barrier,
+every stage writes into buffers kept across calls, and each stage's wall
+time is recorded. The result is bit-identical to the script chain.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+import numpy as np
+
+from ..timing import PACER_PERCENTILES, StreamingHistogram
+from .barrier_certificates import create_single_integrator_barrier_certificate_with_boundary
+
+# Speed below which a robot counts as stopped and gets no turn command.
+STOP_THRESHOLD = 1e-4
+# Fraction of the wheel budget used, so rescaled commands never land on the limit.
+WHEEL_BUDGET_MARGIN = 0.999
+
+
+class StageTimer:
+    """Per-stage wall-clock counters for a fixed sequence of stages.
+
+    Each stage keeps a StreamingHistogram of its durations (seconds) on a
+    monotonic clock; ``report()`` gives count, mean, p50/p95/p99 and max in
+    milliseconds per stage and for the whole call.
+    """
+
+    def __init__(self, stages: tuple[str, ...]) -> None:
+        self.stages = tuple(stages)
+        self.histograms = {stage: StreamingHistogram() for stage in self.stages + ("total",)}
+
+    def add(self, stamps: list[float]) -> None:
+        """Record one call from its len(stages) + 1 perf_counter stamps."""
+        for stage, start, end in zip(self.stages, stamps, stamps[1:]):
+            self.histograms[stage].add(end - start)
+        self.histograms["total"].add(stamps[-1] - stamps[0])
+
+    @property
+    def calls(self) -> int:
+        return self.histograms["total"].count
+
+    def samples(self, stage: str) -> np.ndarray:
+        """Raw per-call durations (seconds) of ``stage`` or ``total``."""
+        return self.histograms[stage].samples
+
+    def reset(self) -> None:
+        self.histograms = {stage: StreamingHistogram() for stage in self.stages + ("total",)}
+
+    def report(self) -> dict:
+        out = {}
+        for stage, hist in self.histograms.items():
+            out[stage] = {
+                "count": hist.count,
+                "mean": hist.total / hist.count * 1e3 if hist.count else 0.0,
+            }
+            out[stage] |= {f"p{q}": hist.percentile(q) * 1e3 for q in PACER_PERCENTILES}
+            out[stage]["max"] = hist.max * 1e3
+        return out
+
+
+def create_safety_pipeline(
+    safety_radius: float = 0.17,
+    plan_linear: float = 0.14,
+    plan_angular: float = 1.8,
+    robot_base_length: float = 0.11,
+    hw_max_linear: float = 0.20,
+    linear_velocity_gain: float = 1.0,
+    boundary_margin: float = 0.05,
+    barrier: Callable | None = None,
+    timing: bool = True,
+):
+    """Barrier -> SI-to-unicycle -> stop guard -> wheel budget in one call.
+
+    Returns a function pipeline(dxi_2xN, poses_3xN, out=None) -> dxu_2xN
+    equal to the 10Runs chain built from the same constants:
+
+    - ``barrier`` (default: the SI barrier with boundary at ``safety_radius``
+      and ``boundary_margin``; it has no speed limit, the wheel stage clamps);
+    - create_si_to_uni_dynamics(linear_velocity_gain, plan_angular);
+    - robots whose barrier output is slower than STOP_THRESHOLD are zeroed;
+    - wheel_safe: clamp v to +-plan_linear and w to +-plan_angular, then
+      rescale any pair with 2|v| + robot_base_length |w| above
+      2 hw_max_linear * WHEEL_BUDGET_MARGIN onto that budget.
+
+    Any barrier closure with the (dxi, x) -> dxi signature can be passed,
+    e.g. a QP barrier. A leading ensemble dimension (B, 2, N) / (B, 3, N) is
+    allowed when the barrier supports it. The stages after the barrier write
+    into buffers reused while the input shape is unchanged. The result is
+    written into ``out`` when given.
+
+    With ``timing`` each call's stage times go to ``pipeline.timer`` (a
+    StageTimer over ``barrier``, ``unicycle``, ``guard`` and ``wheels``);
+    the barrier is exposed as ``pipeline.barrier``.
+    """
+    if barrier is None:
+        barrier = create_single_integrator_barrier_certificate_with_boundary(
+            safety_radius=safety_radius,
+            boundary_margin=boundary_margin,
+        )
+    budget = 2.0 * hw_max_linear * WHEEL_BUDGET_MARGIN
+    timer = StageTimer(("barrier", "unicycle", "guard", "wheels")) if timing else None
+    work: dict[tuple, tuple] = {}
+
+    def buffers(shape: tuple) -> tuple:
+        # dxi squares, then (..., N) rows: norm/demand, heading error, two masks.
+        if shape not in work:
+            row = shape[:-2] + shape[-1:]
+            work.clear()
+            work[shape] = (
+                np.empty(shape),
+                np.empty(row),
+                np.empty(row),
+                np.empty(row, dtype=bool),
+                np.empty(row, dtype=bool),
+            )
+        return work[shape]
+
+    def pipeline(dxi: np.ndarray, x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        stamps = [time.perf_counter()] if timer is not None else None
+        dxi = barrier(dxi, x)
+        if stamps is not None:
+            stamps.append(time.perf_counter())
+
+        squares, norm, work_row, stopped, over = buffers(dxi.shape)
+        if out is None:
+            out = np.empty(dxi.shape)
+        speed, omega = out[..., 0, :], out[..., 1, :]
+
+        # SI -> unicycle: speed = |dxi| * gain, omega = clip(2 * wrapped heading error).
+        np.multiply(dxi, dxi, out=squares)
+        np.add(squares[..., 0, :], squares[..., 1, :], out=norm)
+        np.sqrt(norm, out=norm)
+        np.multiply(norm, linear_velocity_gain, out=speed)
+        np.arctan2(dxi[..., 1, :], dxi[..., 0, :], out=work_row)
+        np.subtract(work_row, x[..., 2, :], out=work_row)
+        work_row += np.pi
+        np.remainder(work_row, 2 * np.pi, out=work_row)
+        work_row -= np.pi
+        np.multiply(work_row, 2.0, out=omega)
+        np.clip(omega, -plan_angular, plan_angular, out=omega)
+        if stamps is not None:
+            stamps.append(time.perf_counter())
+
+        # Stop guard: a robot the barrier halted must not spin on the spot.
+        np.less(norm, STOP_THRESHOLD, out=stopped)
+        if stopped.any():
+            speed[stopped] = 0.0
+            omega[stopped] = 0.0
+        if stamps is not None:
+            stamps.append(time.perf_counter())
+
+        # Wheel budget: |2v| + L|w| <= 2 * hw_max_linear keeps both wheels legal.
+        # omega is already within +-plan_angular from the unicycle stage.
+        np.clip(speed, -plan_linear, plan_linear, out=speed)
+        np.abs(speed, out=norm)
+        norm *= 2.0
+        np.abs(omega, out=work_row)
+        work_row *= robot_base_length
+        norm += work_row
+        np.greater(norm, budget, out=over)
+        if over.any():
+            scale = budget / norm[over]
+            speed[over] *= scale
+            omega[over] *= scale
+        if stamps is not None:
+            stamps.append(time.perf_counter())
+            timer.add(stamps)
+        return out
+
+    pipeline.barrier = barrier
+    pipeline.timer = timer
+    return pipeline
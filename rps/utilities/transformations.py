@@ -28,55 +28,92 @@ def create_si_to_uni_dynamics(
     return converter
 
 
+class HeadingTrig:
+    """cos/sin of the robot headings, computed once per pose update.
+
+    Calling it with 3xN poses returns (cos, sin) arrays of the headings held
+    in reused buffers. The headings of the last call are remembered, so
+    every transform sharing one HeadingTrig within a step (uni -> SI before
+    the barrier, SI -> uni after it) evaluates the trigonometry only once;
+    new poses are detected by comparing headings, which is far cheaper than
+    recomputing them. The returned arrays are overwritten by the next
+    change of poses.
+    """
+
+    def __init__(self) -> None:
+        self._theta = np.empty(0)
+        self._trig = np.empty((2, 0))
+
+    def __call__(self, x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        theta = x[..., 2, :]
+        if self._theta.shape != theta.shape:
+            self._theta = np.empty(theta.shape)
+            self._trig = np.empty((2,) + theta.shape)
+        elif np.array_equal(theta, self._theta):
+            return self._trig[0], self._trig[1]
+        self._theta[...] = theta
+        np.cos(theta, out=self._trig[0])
+        np.sin(theta, out=self._trig[1])
+        return self._trig[0], self._trig[1]
+
+
 def create_si_to_uni_dynamics_with_obstacles(
     linear_velocity_gain: float = 1.0,
     angular_velocity_limit: float = np.pi,
     projection_distance: float = 0.05,
+    heading_trig: HeadingTrig | None = None,
 ):
     """SI to unicycle conversion using near-identity diffeomorphism.
 
     More suitable when barrier certificates are active, as it accounts
     for the projection used by unicycle barriers.
 
-    Returns a function converter(dxi_2xN, poses_3xN) -> dxu_2xN.
+    Returns a function converter(dxi_2xN, poses_3xN, out=None) -> dxu_2xN,
+    vectorized over robots and written into ``out`` when given. Pass the
+    same ``heading_trig`` as create_uni_to_si_dynamics to share the heading
+    cos/sin across a uni -> SI -> uni round trip.
     """
-
-    def converter(dxi: np.ndarray, x: np.ndarray) -> np.ndarray:
-        n = x.shape[1]
-        theta = x[2, :]
-        dxu = np.zeros((2, n))
-
-        for i in range(n):
-            c = np.cos(theta[i])
-            s = np.sin(theta[i])
-            dxu[0, i] = c * dxi[0, i] + s * dxi[1, i]
-            dxu[1, i] = (-s * dxi[0, i] + c * dxi[1, i]) / max(projection_distance, 1e-6)
-
-        dxu[0, :] *= linear_velocity_gain
-        dxu[1, :] = np.clip(dxu[1, :], -angular_velocity_limit, angular_velocity_limit)
-        return dxu
+    trig = heading_trig or HeadingTrig()
+    distance = max(projection_distance, 1e-6)
+
+    def converter(dxi: np.ndarray, x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        c, s = trig(x)
+        if out is None:
+            out = np.empty(c.shape[:-1] + (2, c.shape[-1]))
+        vx, vy = dxi[..., 0, :], dxi[..., 1, :]
+        np.multiply(c * vx + s * vy, linear_velocity_gain, out=out[..., 0, :])
+        np.clip(
+            (-s * vx + c * vy) / distance,
+            -angular_velocity_limit,
+            angular_velocity_limit,
+            out=out[..., 1, :],
+        )
+        return out
 
     return converter
 
 
 def create_uni_to_si_dynamics(
     projection_distance: float = 0.05,
+    heading_trig: HeadingTrig | None = None,
 ):
     """Convert unicycle commands back to single-integrator velocities.
 
     Useful for applying SI barrier certificates to unicycle robots.
 
-    Returns a function converter(dxu_2xN, poses_3xN) -> dxi_2xN.
+    Returns a function converter(dxu_2xN, poses_3xN, out=None) -> dxi_2xN,
+    written into ``out`` when given; ``heading_trig`` is as for
+    create_si_to_uni_dynamics_with_obstacles.
     """
-
-    def converter(dxu: np.ndarray, x: np.ndarray) -> np.ndarray:
-        n = x.shape[1]
-        theta = x[2, :]
-        dxi = np.zeros((2, n))
-
-        dxi[0, :] = dxu[0, :] * np.cos(theta) - projection_distance * dxu[1, :] * np.sin(theta)
-        dxi[1, :] = dxu[0, :] * np.sin(theta) + projection_distance * dxu[1, :] * np.cos(theta)
-
-        return dxi
+    trig = heading_trig or HeadingTrig()
+
+    def converter(dxu: np.ndarray, x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        c, s = trig(x)
+        if out is None:
+            out = np.empty(c.shape[:-1] + (2, c.shape[-1]))
+        v, w = dxu[..., 0, :], dxu[..., 1, :]
+        out[..., 0, :] = v * c - projection_distance * w * s
+        out[..., 1, :] = v * s + projection_distance * w * c
+        return out
 
     return converter
@@ -0,0 +1,126 @@
+"""Convergence checkers and ArrivalTracker against per-robot reference loops."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from rps.utilities.misc import ArrivalTracker, at_pose, at_position
+
+
+def reference_at_pose(states, targets, position_error=0.05, rotation_error=0.2):
+    close = np.zeros(states.shape[1], dtype=bool)
+    for i in range(states.shape[1]):
+        pos_err = np.linalg.norm(states[:2, i] - targets[:2, i])
+        rot_err = abs(((states[2, i] - targets[2, i]) + np.pi) % (2 * np.pi) - np.pi)
+        close[i] = pos_err < position_error and rot_err < rotation_error
+    return close
+
+
+def reference_at_position(states, targets, position_error=0.05):
+    close = np.zeros(states.shape[1], dtype=bool)
+    for i in range(states.shape[1]):
+        close[i] = np.linalg.norm(states[:2, i] - targets[:2, i]) < position_error
+    return close
+
+
+def test_checkers_match_the_loops():
+    rng = np.random.default_rng(0)
+    n = 200
+    targets = np.vstack((rng.uniform(-1, 1, (2, n)), rng.uniform(-np.pi, np.pi, n)))
+    states = targets + np.vstack((rng.normal(0, 0.04, (2, n)), rng.normal(0, 0.2, n)))
+    states[2] += 2 * np.pi * rng.integers(-1, 2, n)  # headings wrap
+    assert np.array_equal(at_pose(states, targets), reference_at_pose(states, targets))
+    assert np.array_equal(
+        at_pose(states, targets, 0.08, 0.3), reference_at_pose(states, targets, 0.08, 0.3)
+    )
+    assert np.array_equal(at_position(states, targets), reference_at_position(states, targets))
+    assert np.array_equal(
+        at_position(states[:2], targets[:2], 0.03), reference_at_position(states, targets, 0.03)
+    )
+    # Replicas stacked as (B, 3, N) give one row each.
+    batch = np.stack([states, targets, 2 * states - targets])
+    expected = [reference_at_pose(s, targets) for s in batch]
+    assert np.array_equal(at_pose(batch, targets), np.array(expected))
+    expected = [reference_at_position(s, targets) for s in batch]
+    assert np.array_equal(at_position(batch, targets), np.array(expected))
+
+
+def reference_tracker(distances, times, radius, hysteresis, dwell_time):
+    """Scalar per-robot state machine, one robot and one step at a time."""
+    steps, n = distances.shape
+    out = {key: np.zeros((steps, n), dtype=bool) for key in ("arrived", "in", "out", "dwelled")}
+    first = np.full(n, np.nan)
+    count = np.zeros(n, dtype=int)
+    for i in range(n):
+        arrived, entered = False, None
+        for k in range(steps):
+            d, t = distances[k, i], times[k]
+            if not arrived and d < radius:
+                arrived, entered = True, t
+                out["in"][k, i] = True
+                count[i] += 1
+                if np.isnan(first[i]):
+                    first[i] = t
+            elif arrived and d >= radius + hysteresis:
+                arrived, entered = False, None
+                out["out"][k, i] = True
+            out["arrived"][k, i] = arrived
+            out["dwelled"][k, i] = arrived and t - entered >= dwell_time
+    return out, first, count
+
+
+@pytest.mark.parametrize("hysteresis, dwell_time", [(0.0, 0.0), (0.03, 0.0), (0.03, 0.2)])
+def test_tracker_matches_the_scalar_state_machine(hysteresis, dwell_time):
+    rng = np.random.default_rng(1)
+    n, steps, radius = 12, 150, 0.12
+    targets = rng.uniform(-1, 1, (2, n))
+    # Each robot wanders around its target, crossing the radius repeatedly.
+    offset = np.cumsum(rng.normal(0, 0.02, (steps, 2, n)), axis=0)
+    offset += rng.uniform(-0.2, 0.2, (2, n))
+    positions = targets + offset
+    times = 0.033 * np.arange(steps)
+    distances = np.linalg.norm(offset, axis=1)
+    expected, first, count = reference_tracker(distances, times, radius, hysteresis, dwell_time)
+
+    tracker = ArrivalTracker(radius, hysteresis=hysteresis, dwell_time=dwell_time)
+    for k in range(steps):
+        arrived = tracker.update(positions[k], targets)  # the tracker's own clock
+        assert np.isclose(tracker.time, times[k])
+        assert np.array_equal(arrived, expected["arrived"][k])
+        assert np.array_equal(tracker.just_arrived, expected["in"][k])
+        assert np.array_equal(tracker.just_left, expected["out"][k])
+        assert np.array_equal(tracker.dwelled, expected["dwelled"][k])
+        assert np.all(tracker.dwell[~arrived] == 0.0)
+    assert np.array_equal(tracker.first_arrival, first, equal_nan=True)
+    assert np.array_equal(tracker.arrivals, count)
+    assert expected["out"].any()  # the walk really does leave again
+
+    report = tracker.report()
+    assert report["updates"] == steps
+    assert report["arrivals"] == count.sum()
+    assert report["ever_arrived"] == np.count_nonzero(~np.isnan(first))
+
+
+def test_reset_dwell_and_per_update_radius():
+    tracker = ArrivalTracker(0.1, dwell_time=0.5)
+    targets = np.zeros((2, 3))
+    positions = np.array([[0.05, 0.15, 1.0], [0.0, 0.0, 0.0]])
+    tracker.update(positions, targets, t=1.0)
+    assert tracker.arrived.tolist() == [True, False, False]
+    tracker.update(positions, targets, t=1.6)
+    assert tracker.dwelled.tolist() == [True, False, False]
+    assert np.isclose(tracker.dwell[0], 0.6)
+
+    # A looser radius at a via point admits robot 1 for this update only.
+    tracker.update(positions, targets, t=1.7, radius=0.2)
+    assert tracker.just_arrived.tolist() == [False, True, False]
+
+    # A new target ends the stay without a just_left event.
+    tracker.reset([0])
+    assert not tracker.arrived[0] and tracker.dwell[0] == 0.0
+    tracker.update(positions, targets, t=1.8)
+    assert tracker.just_arrived.tolist() == [True, False, False]
+    assert tracker.just_left.tolist() == [False, True, False]
+    assert tracker.first_arrival[0] == 1.0
+    assert tracker.arrivals.tolist() == [2, 1, 0]
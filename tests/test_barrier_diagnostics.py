@@ -0,0 +1,42 @@
+"""Barrier diagnostics and closest_pair_distance against brute force."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from rps.utilities import barrier_certificates as bc
+
+
+def brute_min_distance(x: np.ndarray) -> float:
+    d = np.hypot(*(x[:2, :, None] - x[:2, None, :]))
+    d[np.diag_indices(x.shape[1])] = np.inf
+    return float(d.min())
+
+
+@pytest.mark.parametrize("spacing", [0.1, 0.6])
+@pytest.mark.parametrize("search", ["dense", "grid"])
+def test_diagnostics_from_candidates(spacing, search):
+    rng = np.random.default_rng(3)
+    n = 150
+    x = np.vstack((rng.uniform(-1.5, 1.5, (2, n)) * spacing / 0.6, np.zeros((1, n))))
+    barrier = bc.create_single_integrator_barrier_certificate(
+        neighbor_search=search, return_diagnostics=True
+    )
+    _, diagnostics = barrier(np.zeros((2, n)), x)
+    exact = brute_min_distance(x)
+    expected = exact if exact < 0.17 else np.inf
+    assert diagnostics["min_distance"] == expected
+    assert diagnostics["penetration"] == max(0.0, 0.17 - expected)
+    d = np.hypot(*(x[:2, :, None] - x[:2, None, :]))
+    assert diagnostics["close_pairs"] == np.count_nonzero(np.triu(d < 0.17, k=1))
+
+
+def test_closest_pair_distance_is_exact():
+    rng = np.random.default_rng(4)
+    x = rng.uniform(-1.5, 1.5, (4, 3, 60))
+    expected = [brute_min_distance(replica) for replica in x]
+    assert np.array_equal(bc.closest_pair_distance(x), expected)
+    assert bc.closest_pair_distance(x[0]) == expected[0]
+    assert bc.closest_pair_distance(np.array([[0.0, 2.0], [0.0, 0.0], [0.0, 0.0]])) == 2.0
+    assert bc.closest_pair_distance(np.zeros((3, 1))) == np.inf
@@ -0,0 +1,83 @@
+"""Equivalence checks for the vectorized SI barrier certificates.
+
+The vectorized factories must reproduce the original per-pair loop (kept as
+reference_si_barrier in benchmarks/bench_barriers.py) within 1e-12.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from benchmarks.bench_barriers import reference_si_barrier
+from rps.utilities import barrier_certificates as bc
+
+SAFETY_RADIUS = 0.17
+
+
+def random_poses(n: int, rng: np.random.Generator, spacing: float = 0.15) -> np.ndarray:
+    """3xN poses dense enough for many close pairs, some near the walls."""
+    half = 0.5 * spacing * np.sqrt(n)
+    x = rng.uniform(-min(half, 1.7), min(half, 1.7), n)
+    y = rng.uniform(-min(half, 1.1), min(half, 1.1), n)
+    return np.vstack((x, y, rng.uniform(-np.pi, np.pi, n)))
+
+
+@pytest.mark.parametrize("n", [2, 20, 100])
+@pytest.mark.parametrize("seed", range(3))
+def test_si_barrier_matches_loop(n, seed):
+    rng = np.random.default_rng(seed)
+    x = random_poses(n, rng)
+    dxi = rng.uniform(-0.15, 0.15, (2, n))
+    barrier = bc.create_single_integrator_barrier_certificate(
+        safety_radius=SAFETY_RADIUS, magnitude_limit=0.2, neighbor_search="dense"
+    )
+    expected = reference_si_barrier(dxi, x, SAFETY_RADIUS, magnitude_limit=0.2)
+    np.testing.assert_allclose(barrier(dxi, x), expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("n", [2, 20, 100])
+@pytest.mark.parametrize("seed", range(3))
+def test_si_barrier_with_boundary_matches_loop(n, seed):
+    rng = np.random.default_rng(seed)
+    x = random_poses(n, rng)
+    dxi = rng.uniform(-0.15, 0.15, (2, n))
+    barrier = bc.create_single_integrator_barrier_certificate_with_boundary(
+        safety_radius=SAFETY_RADIUS, boundary_margin=0.05, neighbor_search="dense"
+    )
+    expected = reference_si_barrier(dxi, x, SAFETY_RADIUS, boundary_margin=0.05)
+    np.testing.assert_allclose(barrier(dxi, x), expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize(
+    "factory",
+    [
+        bc.create_single_integrator_barrier_certificate,
+        bc.create_single_integrator_barrier_certificate_with_boundary,
+    ],
+)
+@pytest.mark.parametrize("skin", [None, 0.05])
+@pytest.mark.parametrize("n", [2, 20, 100, 400])
+def test_grid_search_is_bit_identical_to_dense(factory, skin, n):
+    rng = np.random.default_rng(n)
+    dense = factory(safety_radius=SAFETY_RADIUS, neighbor_search="dense")
+    grid = factory(safety_radius=SAFETY_RADIUS, neighbor_search="grid", neighbor_skin=skin)
+    x = random_poses(n, rng)
+    for _ in range(5):
+        dxi = rng.uniform(-0.15, 0.15, (2, n))
+        assert np.array_equal(grid(dxi, x), dense(dxi, x))
+        x[:2] += 0.033 * dxi
+
+
+@pytest.mark.parametrize(
+    "factory",
+    [bc.create_unicycle_barrier_certificate, bc.create_unicycle_barrier_certificate_with_boundary],
+)
+def test_unicycle_neighbor_options_match_dense(factory):
+    rng = np.random.default_rng(7)
+    x = random_poses(200, rng)
+    dxu = np.vstack((rng.uniform(-0.2, 0.2, 200), rng.uniform(-2.0, 2.0, 200)))
+    dense = factory(neighbor_search="dense")
+    skin = factory(neighbor_search="grid", neighbor_skin=0.05)
+    assert np.array_equal(skin(dxu, x), dense(dxu, x))
+    assert skin.neighbor_list.calls == 1 and dense.neighbor_list is None
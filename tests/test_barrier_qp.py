@@ -0,0 +1,93 @@
+"""The numpy QP barriers against a dense reference solve of the same QP."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from rps.utilities import barrier_certificates as bc
+
+GAIN = 100.0
+RADIUS = 0.17
+LIMIT = 0.2
+ARENA = (-1.6, 1.6, -1.0, 1.0)
+
+
+def reference_qp(dxi, x, boundary):
+    """Hildreth's dual coordinate ascent on every pair and wall row, run to 1e-12."""
+    n = x.shape[1]
+    u_nom = dxi.copy()
+    mag = np.linalg.norm(u_nom, axis=0)
+    u_nom[:, mag > LIMIT] *= LIMIT / mag[mag > LIMIT]
+    rows, bounds = [], []
+    for i in range(n):
+        for j in range(i + 1, n):
+            d = x[:2, i] - x[:2, j]
+            row = np.zeros(2 * n)
+            row[2 * i : 2 * i + 2] = -2.0 * d
+            row[2 * j : 2 * j + 2] = 2.0 * d
+            rows.append(row)
+            bounds.append(GAIN * (d @ d - RADIUS**2) ** 3)
+    if boundary:
+        x_min, x_max, y_min, y_max = ARENA
+        half = RADIUS / 2
+        for i in range(n):
+            for axis, sign, gap in (
+                (0, 1.0, x_max - half - x[0, i]),
+                (0, -1.0, x[0, i] - x_min - half),
+                (1, 1.0, y_max - half - x[1, i]),
+                (1, -1.0, x[1, i] - y_min - half),
+            ):
+                row = np.zeros(2 * n)
+                row[2 * i + axis] = sign
+                rows.append(row)
+                bounds.append(0.4 * GAIN * gap**3)
+    a, b = np.array(rows), np.array(bounds)
+    u0 = u_nom.T.ravel()
+    lam = np.zeros(len(b))
+    norms = (a * a).sum(axis=1)
+    u = u0.copy()
+    for _ in range(20000):
+        previous = lam.copy()
+        for k in range(len(b)):
+            step = max(-lam[k], (a[k] @ u - b[k]) / norms[k])
+            lam[k] += step
+            u -= step * a[k]
+        if np.abs(lam - previous).max() < 1e-12:
+            break
+    return u.reshape(n, 2).T
+
+
+@pytest.mark.parametrize("boundary", [False, True])
+@pytest.mark.parametrize("n", [2, 8, 20])
+@pytest.mark.parametrize("seed", range(3))
+def test_qp_matches_reference_solve(boundary, n, seed):
+    rng = np.random.default_rng(seed)
+    half = 0.12 * np.sqrt(n)
+    x = np.vstack((rng.uniform(-half, half, (2, n)), np.zeros((1, n))))
+    if boundary:
+        x[0, 0] = 1.5  # near the x_max wall, driving into it
+    dxi = rng.uniform(-0.3, 0.3, (2, n))
+    dxi[0, 0] = 0.2
+    factory = (
+        bc.create_single_integrator_barrier_certificate_qp_with_boundary
+        if boundary
+        else bc.create_single_integrator_barrier_certificate_qp
+    )
+    barrier = factory(safety_radius=RADIUS, barrier_gain=GAIN, magnitude_limit=LIMIT)
+    expected = reference_qp(dxi, x, boundary)
+    np.testing.assert_allclose(barrier(dxi, x), expected, rtol=0, atol=1e-5)
+    assert barrier.solver.converged
+
+
+def test_qp_warm_start_keeps_the_solution():
+    rng = np.random.default_rng(5)
+    x = np.vstack((rng.uniform(-0.4, 0.4, (2, 15)), np.zeros((1, 15))))
+    cold = bc.create_single_integrator_barrier_certificate_qp(warm_start=False)
+    warm = bc.create_single_integrator_barrier_certificate_qp()
+    for _ in range(20):
+        dxi = -0.5 * x[:2]
+        u = warm(dxi, x)
+        np.testing.assert_allclose(u, cold(dxi, x), rtol=0, atol=1e-5)
+        x[:2] += 0.033 * u
+    assert np.mean(warm.solver.iterations) <= np.mean(cold.solver.iterations)
@@ -0,0 +1,53 @@
+"""Ensemble (B, ., N) barrier calls against separate per-replica barriers."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from rps.utilities import barrier_certificates as bc
+
+FACTORIES = [
+    bc.create_single_integrator_barrier_certificate,
+    bc.create_single_integrator_barrier_certificate_with_boundary,
+    bc.create_single_integrator_barrier_certificate_qp,
+    bc.create_single_integrator_barrier_certificate_qp_with_boundary,
+]
+
+
+def crowd(replicas: int, n: int, rng: np.random.Generator) -> np.ndarray:
+    """(B, 3, N) poses about 0.35 m apart in the middle of the arena."""
+    side = min(0.35 * np.sqrt(n), 1.9)
+    xy = rng.uniform(-side / 2, side / 2, (replicas, 2, n))
+    return np.concatenate([xy, rng.uniform(-np.pi, np.pi, (replicas, 1, n))], axis=1)
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("factory", FACTORIES)
+@pytest.mark.parametrize(("replicas", "n"), [(4, 20), (8, 40)])
+def test_ensemble_slices_equal_separate_barriers(factory, replicas, n):
+    rng = np.random.default_rng(n)
+    x = crowd(replicas, n, rng)
+    goals = crowd(replicas, n, rng)[:, :2]
+    batch = factory(return_diagnostics=True)
+    singles = [factory(return_diagnostics=True) for _ in range(replicas)]
+    for _ in range(15):
+        dxi = 0.5 * (goals - x[:, :2])
+        safe, diagnostics = batch(dxi, x)
+        for b, single in enumerate(singles):
+            expected, single_diagnostics = single(dxi[b], x[b])
+            assert np.array_equal(safe[b], expected)
+            for name, value in single_diagnostics.items():
+                assert np.array_equal(np.asarray(diagnostics[name])[b], value), name
+        x[:, :2] += 0.033 * safe
+
+
+def test_unicycle_ensemble_slices_equal_separate_barriers():
+    rng = np.random.default_rng(0)
+    x = crowd(3, 30, rng)
+    dxu = np.stack([rng.uniform(-0.2, 0.2, (3, 30)), rng.uniform(-2, 2, (3, 30))], axis=1)
+    batch = bc.create_unicycle_barrier_certificate_with_boundary()
+    single = bc.create_unicycle_barrier_certificate_with_boundary()
+    safe = batch(dxu, x)
+    for b in range(3):
+        assert np.array_equal(safe[b], single(dxu[b], x[b]))
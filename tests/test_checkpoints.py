@@ -0,0 +1,101 @@
+"""Robotarium snapshot/restore/fork checkpoints."""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+from rps.robotarium import Robotarium
+
+
+def simulator(**options) -> Robotarium:
+    poses = np.array([[0.0, 0.5, -0.5], [0.0, 0.2, -0.2], [0.0, 1.0, 2.0]])
+    return Robotarium(3, initial_conditions=poses, time_loop=False, **options)
+
+
+def run(r: Robotarium, steps: int) -> list[float]:
+    """Script-style loop drawing noisy commands from the global RNGs; return the draws."""
+    draws = []
+    for _ in range(steps):
+        r.get_poses()
+        v = 0.1 + 0.05 * np.random.rand(3)
+        draws.append(random.random())
+        r.set_velocities(np.arange(3), np.vstack((v, np.full(3, draws[-1]))))
+        r.step()
+    return draws
+
+
+@pytest.mark.parametrize("history", ["list", "buffer", "ring"])
+def test_restore_replays_the_same_continuation(history):
+    np.random.seed(0)
+    random.seed(0)
+    r = simulator(history=history, history_length=64)
+    run(r, 10)
+    r.set_left_leds(np.arange(3), np.full((3, 3), 200))
+    state = r.snapshot()
+    first = run(r, 12)
+    poses, frames, leds = r.get_poses(), r.history.as_array(), r.leds.as_array()
+
+    r.restore(state)
+    assert run(r, 12) == first
+    assert np.array_equal(r.get_poses(), poses)
+    assert np.array_equal(r.history.as_array(), frames)
+    assert np.array_equal(r.leds.as_array(), leds)
+
+
+def test_snapshot_from_an_abandoned_branch_is_rejected():
+    r = simulator()
+    run(r, 5)
+    early = r.snapshot()
+    run(r, 5)
+    late = r.snapshot()
+    r.restore(early)
+    run(r, 8)
+    with pytest.raises(ValueError):
+        r.restore(late)
+    r.restore(early)
+
+
+def test_fork_replicas_reproduce_standalone_runs():
+    np.random.seed(1)
+    random.seed(1)
+    parent = simulator()
+    run(parent, 10)
+    state = parent.snapshot()
+    replicas = parent.fork(3)
+    results = []
+    for replica in replicas:
+        draws = run(replica, 10)
+        results.append((draws, replica.get_poses()))
+
+    parent.restore(state)
+    expected = run(parent, 10)
+    for draws, poses in results:
+        assert draws == expected
+        assert np.array_equal(poses, parent.get_poses())
+
+
+def test_fork_branches_keep_their_snapshots_apart():
+    parent = simulator()
+    run(parent, 10)
+    before = parent.snapshot()
+    replica, other = parent.fork(2)
+
+    run(parent, 10)
+    parent_state = parent.snapshot()
+    run(replica, 15)
+    replica_state = replica.snapshot()
+    with pytest.raises(ValueError):
+        replica.restore(parent_state)
+    with pytest.raises(ValueError):
+        other.restore(replica_state)
+    with pytest.raises(ValueError):
+        parent.restore(replica_state)
+
+    # The shared prefix belongs to every timeline.
+    for sim in (parent, replica, other):
+        sim.restore(before)
+        assert np.array_equal(sim.get_poses(), before["poses"])
+        assert len(sim.history) == 11
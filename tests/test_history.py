@@ -0,0 +1,116 @@
+"""Robotarium history backends against the legacy list history."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from rps.history import load_history
+from rps.robotarium import Robotarium
+
+N = 4
+
+
+def drive(r: Robotarium, steps: int) -> None:
+    for t in range(steps):
+        r.set_velocities(np.arange(N), np.vstack((np.full(N, 0.1), np.full(N, 0.2 * (t % 5)))))
+        r.step()
+
+
+def simulator(**options) -> Robotarium:
+    poses = np.vstack((np.linspace(-1.0, 1.0, N), np.zeros(N), np.linspace(0, np.pi, N)))
+    return Robotarium(N, initial_conditions=poses, time_loop=False, **options)
+
+
+@pytest.mark.parametrize("every", [1, 3])
+def test_backends_record_the_list_frames(every):
+    reference = simulator(history_every=every)
+    drive(reference, 40)
+    frames = reference.history.as_array()
+    assert len(frames) == 1 + 40 // every
+
+    buffer = simulator(history="buffer", history_length=64, history_every=every)
+    drive(buffer, 40)
+    assert np.array_equal(buffer.history.as_array(), frames)
+
+    ring = simulator(history="ring", history_length=5, history_every=every)
+    drive(ring, 40)
+    assert np.array_equal(ring.history.as_array(), frames[-5:])
+    assert ring.history.total_frames == len(frames)
+
+    single = simulator(
+        history="buffer", history_length=64, history_every=every, history_dtype=np.float32
+    )
+    drive(single, 40)
+    assert single.history.as_array().dtype == np.float32
+    np.testing.assert_allclose(single.history.as_array(), frames, rtol=0, atol=1e-6)
+
+    off = simulator(history="off")
+    drive(off, 40)
+    assert len(off.history) == 0
+    assert np.array_equal(off.get_poses(), reference.get_poses())
+
+
+def test_full_buffer_raises():
+    r = simulator(history="buffer", history_length=3)
+    drive(r, 2)
+    with pytest.raises(IndexError):
+        drive(r, 1)
+
+
+def test_backends_need_a_length():
+    with pytest.raises(ValueError):
+        simulator(history="ring")
+    with pytest.raises(ValueError):
+        simulator(history="bogus")
+
+
+def test_memmap_history_round_trips_through_load_history(tmp_path):
+    path = tmp_path / "run.npy"
+    reference = simulator(history_every=2)
+    drive(reference, 30)
+    r = simulator(
+        history="memmap",
+        history_length=100,
+        history_path=str(path),
+        history_every=2,
+        seed=7,
+        script_name="test_run.py",
+    )
+    drive(r, 30)
+    r.call_at_scripts_end()
+
+    frames, metadata = load_history(path)
+    assert isinstance(frames, np.memmap)
+    assert np.array_equal(frames, reference.history.as_array())
+    assert metadata["frames"] == 16
+    assert metadata["number_of_robots"] == N
+    assert metadata["time_step"] == r.time_step
+    assert metadata["seed"] == 7
+    assert metadata["script_name"] == "test_run.py"
+
+
+@pytest.mark.parametrize("every", [1, 3, 4])
+def test_step_many_records_the_frames_of_repeated_steps(every):
+    poses = np.array([[1.55, 0.0, -0.5, 0.2], [0.0, 0.8, -0.3, 0.0], [0.0, 1.5, 2.0, -1.0]])
+    commands = np.array([[0.2, 0.15, 0.1, 0.0], [0.0, 0.5, -1.0, 0.7]])
+    stepped = Robotarium(
+        N, initial_conditions=poses, integrator="arc", history_every=every, time_loop=False
+    )
+    fast = Robotarium(N, initial_conditions=poses, history_every=every, time_loop=False)
+    for sim in (stepped, fast):
+        sim.set_velocities(np.arange(N), commands.copy())
+    stepped.step()
+    fast.step_many(1)
+    for k in (7, 1, 12):  # crosses the decimation grid at varying offsets
+        for _ in range(k):
+            stepped.step()
+        fast.step_many(k)
+
+    # Robot 0 reaches the x wall and must stay clamped there.
+    assert fast.get_poses()[0, 0] == Robotarium.BOUNDARY_X
+    np.testing.assert_allclose(fast.get_poses(), stepped.get_poses(), rtol=0, atol=1e-12)
+    assert len(fast.history) == len(stepped.history)
+    np.testing.assert_allclose(
+        fast.history.as_array(), stepped.history.as_array(), rtol=0, atol=1e-12
+    )
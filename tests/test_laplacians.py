@@ -0,0 +1,116 @@
+"""Sparse graph Laplacians against dense reference loops."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from rps.utilities.misc import (
+    GraphLaplacian,
+    completeGL,
+    cycle_GL,
+    lineGL,
+    random_connectedGL,
+    topological_neighbors,
+)
+
+
+def reference_cycle(n):
+    L = np.zeros((n, n))
+    for i in range(n):
+        L[i, i] = 2
+        L[i, (i + 1) % n] = -1
+        L[i, (i - 1) % n] = -1
+    return L
+
+
+def reference_line(n):
+    L = np.zeros((n, n))
+    for i in range(n):
+        if i > 0:
+            L[i, i] += 1
+            L[i, i - 1] = -1
+        if i < n - 1:
+            L[i, i] += 1
+            L[i, i + 1] = -1
+    return L
+
+
+def reference_complete(n):
+    return n * np.eye(n) - np.ones((n, n))
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 4, 7, 20])
+@pytest.mark.parametrize(
+    "builder, reference",
+    [(cycle_GL, reference_cycle), (lineGL, reference_line), (completeGL, reference_complete)],
+)
+def test_builders_match_the_dense_loops(builder, reference, n):
+    expected = reference(n)
+    assert np.array_equal(builder(n), expected)
+    sparse = builder(n, sparse=True)
+    assert isinstance(sparse, GraphLaplacian)
+    assert sparse.shape == (n, n)
+    assert np.array_equal(sparse.toarray(), expected)
+    assert np.array_equal(np.asarray(sparse), expected)
+
+
+@pytest.mark.parametrize("p", [0.0, 0.1, 0.5, 1.0])
+def test_random_connected_graph(p):
+    n = 30
+    dense = random_connectedGL(n, p, seed=3)
+    sparse = random_connectedGL(n, p, sparse=True, seed=3)
+    assert np.array_equal(sparse.toarray(), dense)
+    assert np.array_equal(dense, dense.T)
+    assert np.allclose(dense.sum(axis=1), 0.0)
+    # The path is always present, the other pairs follow edge_probability.
+    i = np.arange(n - 1)
+    assert np.all(dense[i, i + 1] == -1)
+    extra = -np.triu(dense, k=2).sum()
+    if p == 0.0:
+        assert extra == 0
+    if p == 1.0:
+        assert extra == (n - 1) * (n - 2) // 2
+    assert np.array_equal(random_connectedGL(n, p, seed=3), dense)
+
+
+def test_edge_probability_is_respected():
+    n, p = 200, 0.05
+    pairs = (n - 1) * (n - 2) // 2
+    edges = sum(random_connectedGL(n, p, sparse=True, seed=s).edges()[0].size for s in range(5))
+    extra = (edges - 5 * (n - 1)) / (5 * pairs)
+    assert abs(extra - p) < 0.005
+
+
+def test_products_neighbors_and_edges_match_dense():
+    rng = np.random.default_rng(0)
+    n = 25
+    dense = random_connectedGL(n, 0.2, seed=rng)
+    L = GraphLaplacian.from_dense(dense)
+    x = rng.normal(size=n)
+    X = rng.normal(size=(n, 3))
+    P = rng.normal(size=(2, n))
+    assert np.allclose(L @ x, dense @ x)
+    assert np.allclose(L @ X, dense @ X)
+    assert np.allclose(P @ L, P @ dense)
+    assert np.allclose(x @ L, x @ dense)
+    assert np.allclose(L.dot(X), dense @ X)
+    for agent in range(n):
+        expected = np.where(dense[agent] < 0)[0]
+        assert np.array_equal(L.neighbors(agent), expected)
+        assert np.array_equal(topological_neighbors(L, agent), expected)
+        assert np.array_equal(topological_neighbors(dense, agent), expected)
+    assert np.array_equal(L.degree, np.diag(dense))
+    i, j = L.edges()
+    assert np.all(i < j)
+    assert np.array_equal(GraphLaplacian.from_edges(n, i, j).toarray(), dense)
+
+
+def test_from_edges_ignores_repeats_and_self_loops():
+    L = GraphLaplacian.from_edges(4, [0, 1, 0, 2, 3], [1, 0, 1, 2, 2])
+    expected = np.zeros((4, 4))
+    for a, b in [(0, 1), (2, 3)]:
+        expected[a, b] = expected[b, a] = -1
+    expected[np.diag_indices(4)] = -expected.sum(axis=1)
+    assert np.array_equal(L.toarray(), expected)
+    assert L.nnz == 8
@@ -0,0 +1,66 @@
+"""LedRecorder keyframe reconstruction against a dense per-frame record."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from rps.leds import LEFT, RIGHT, LedRecorder
+from rps.robotarium import Robotarium
+
+
+@pytest.mark.parametrize("interval", [1, 4, 256])
+@pytest.mark.parametrize("leading", [(), (3,)])
+def test_frames_rebuild_the_dense_record(interval, leading):
+    rng = np.random.default_rng(interval)
+    n = 6
+    leds = LedRecorder(n, leading, keyframe_interval=interval)
+    state = np.zeros(leading + (2, 3, n), dtype=np.uint8)
+    dense = [state.copy()]
+    for _ in range(40):
+        for _ in range(rng.integers(0, 3)):
+            side = int(rng.integers(2))
+            ids = rng.choice(n, size=int(rng.integers(1, n + 1)), replace=False)
+            colors = rng.integers(0, 4, leading + (3, ids.size)) * 80.0
+            leds.set(side, ids, colors)
+            state[..., side, :, ids] = np.moveaxis(colors.astype(np.uint8), -1, 0)
+        dense[-1] = state.copy()  # a frame holds the colours set before it advances
+        advance = int(rng.integers(1, 4))
+        leds.advance(advance)
+        dense.extend(state.copy() for _ in range(advance))
+
+    dense = np.array(dense)
+    assert len(leds) == len(dense)
+    assert np.array_equal(leds.as_array(), dense)
+    for t in range(len(dense)):
+        assert np.array_equal(leds[t], dense[t])
+    assert np.array_equal(leds[-1], leds.current())
+
+
+def test_unchanged_colours_are_not_stored():
+    leds = LedRecorder(4)
+    red = np.tile([[255.0], [0.0], [0.0]], 4)
+    assert leds.set(LEFT, np.arange(4), red) == 4
+    for _ in range(100):
+        assert leds.set(LEFT, np.arange(4), red) == 0
+        leds.advance()
+    assert leds.changes == 4
+    assert leds.set(RIGHT, [2], [[0], [0], [255]]) == 1
+    assert leds.changes == 5
+
+
+def test_robotarium_led_frames_follow_steps_and_restore():
+    r = Robotarium(2, time_loop=False)
+    r.set_left_leds(np.arange(2), np.full((3, 2), 10))
+    r.step()
+    state = r.snapshot()
+    r.set_right_leds([1], [[20], [30], [40]])
+    r.step()
+    assert len(r.leds) == len(r.history) == 3
+    # Frame t holds the colours in effect while step t + 1 runs.
+    assert r.leds[0][LEFT, 0, 0] == 10 and r.leds[0][RIGHT, 0, 1] == 0
+    assert r.leds[1][RIGHT, :, 1].tolist() == [20, 30, 40]
+    r.restore(state)
+    assert len(r.leds) == 2
+    assert r.leds.current()[RIGHT, 0, 1] == 0
+    assert np.array_equal(r.leds.current(), r.leds[1])
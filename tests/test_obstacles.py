@@ -0,0 +1,92 @@
+"""ObstacleMap signed distances against analytic ones, and the barrier path."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from rps.utilities import barrier_certificates as bc
+from rps.utilities.obstacles import ObstacleMap
+
+RESOLUTION = 0.01
+
+
+def _points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.vstack((rng.uniform(-1.6, 1.6, n), rng.uniform(-1.0, 1.0, n)))
+
+
+def _rectangle(xy, x_min, x_max, y_min, y_max):
+    dx = np.maximum.reduce([x_min - xy[0], np.zeros(xy.shape[1]), xy[0] - x_max])
+    dy = np.maximum.reduce([y_min - xy[1], np.zeros(xy.shape[1]), xy[1] - y_max])
+    inside = np.minimum.reduce([xy[0] - x_min, x_max - xy[0], xy[1] - y_min, y_max - xy[1]])
+    return np.where((dx == 0) & (dy == 0), -inside, np.hypot(dx, dy))
+
+
+def _walls(xy):
+    return np.minimum.reduce([xy[0] + 1.6, 1.6 - xy[0], xy[1] + 1.0, 1.0 - xy[1]])
+
+
+def test_distances_match_the_analytic_ones():
+    xy = _points(2000)
+    rectangle = (-0.2, 0.2, -1.0, -0.4)
+    center, radius = np.array([1.0, 0.5]), 0.1
+    # A square given as a polygon must read like the same rectangle.
+    square = [(-1.2, 0.2), (-0.8, 0.2), (-0.8, 0.6), (-1.2, 0.6)]
+    ward = (
+        ObstacleMap(resolution=RESOLUTION)
+        .add_rectangle(*rectangle)
+        .add_circle(center, radius)
+        .add_polygon(square)
+    )
+    expected = np.minimum.reduce(
+        [
+            _walls(xy),
+            _rectangle(xy, *rectangle),
+            np.hypot(xy[0] - center[0], xy[1] - center[1]) - radius,
+            _rectangle(xy, -1.2, -0.8, 0.2, 0.6),
+        ]
+    )
+    assert len(ward) == 3
+    # Bilinear lookup is exact on flat pieces and within a cell near kinks.
+    assert np.abs(ward.distance(xy) - expected).max() < RESOLUTION
+
+
+def test_triangle_sign_and_normals():
+    triangle = ObstacleMap(resolution=RESOLUTION, walls=False).add_polygon(
+        [(0.0, 0.0), (0.6, 0.0), (0.0, 0.6)]
+    )
+    # Inside, below the base, on the hypotenuse, left of a leg, past a vertex.
+    xy = np.array([[0.1, 0.3, 0.3, -0.2, 0.8], [0.2, -0.2, 0.3, 0.3, -0.1]])
+    expected = np.array([-0.1, 0.2, 0.0, 0.2, np.hypot(0.2, 0.1)])
+    distance, normal = triangle.query(xy)
+    assert np.allclose(distance, expected, atol=RESOLUTION)
+    outward = np.array([[-1.0, 0.0, -1.0], [0.0, -1.0, 0.0]])
+    assert np.allclose(normal[:, [0, 1, 3]], outward, atol=0.05)
+    assert np.allclose(np.hypot(*normal), 1.0)
+
+
+def test_walls_only_map_reproduces_the_arena_boundary():
+    rng = np.random.default_rng(1)
+    n = 40
+    # Robots spread along the walls (away from corners), some heading out.
+    along = rng.uniform(-0.8, 0.8, n)
+    x = np.vstack((along, np.where(rng.random(n) < 0.5, -0.98, 0.98)))
+    x[:, ::4] = np.vstack((np.sign(along[::4]) * 1.58, 0.5 * along[::4]))
+    x[0, ::2] += 0.01 * np.arange(n // 2)
+    dxi = rng.uniform(-0.2, 0.2, (2, n))
+    arena = bc.create_single_integrator_barrier_certificate_with_boundary()
+    mapped = bc.create_single_integrator_barrier_certificate_with_boundary(
+        obstacles=ObstacleMap(resolution=RESOLUTION)
+    )
+    assert np.allclose(mapped(dxi, x), arena(dxi, x))
+
+
+def test_barrier_reflects_motion_into_an_obstacle():
+    ward = ObstacleMap(resolution=RESOLUTION).add_circle((0.0, 0.0), 0.3)
+    barrier = bc.create_single_integrator_barrier_certificate_with_boundary(obstacles=ward)
+    # One robot touching the disc and driving into it, one far away.
+    x = np.array([[0.33, -1.0], [0.0, 0.5]])
+    dxi = np.array([[-0.1, -0.1], [0.05, 0.05]])
+    safe = barrier(dxi, x)
+    assert np.allclose(safe[:, 0], [0.1, 0.05], atol=1e-3)
+    assert np.allclose(safe[:, 1], dxi[:, 1])
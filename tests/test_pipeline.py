@@ -0,0 +1,72 @@
+"""create_safety_pipeline against the 10Runs safety chain it replaces."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from rps.utilities import barrier_certificates as bc
+from rps.utilities import transformations as tr
+from rps.utilities.pipeline import create_safety_pipeline
+
+SAFETY_RADIUS = 0.17
+PLAN_LINEAR = 0.14
+PLAN_ANGULAR = 1.8
+ROBOT_BASE_LENGTH = 0.11
+HW_MAX_LINEAR = 0.20
+
+
+def random_poses(n: int, rng: np.random.Generator, spacing: float = 0.15) -> np.ndarray:
+    half = 0.5 * spacing * np.sqrt(n)
+    x = rng.uniform(-min(half, 1.7), min(half, 1.7), n)
+    y = rng.uniform(-min(half, 1.1), min(half, 1.1), n)
+    return np.vstack((x, y, rng.uniform(-np.pi, np.pi, n)))
+
+
+def script_chain():
+    """The per-step safety stack exactly as the 10Runs scripts build it."""
+    si_barrier = bc.create_single_integrator_barrier_certificate_with_boundary(
+        safety_radius=SAFETY_RADIUS, magnitude_limit=PLAN_LINEAR
+    )
+    si_to_uni = tr.create_si_to_uni_dynamics(
+        linear_velocity_gain=1.0, angular_velocity_limit=PLAN_ANGULAR
+    )
+
+    def wheel_safe(dxu):
+        out = np.copy(dxu)
+        out[0, :] = np.clip(out[0, :], -PLAN_LINEAR, PLAN_LINEAR)
+        out[1, :] = np.clip(out[1, :], -PLAN_ANGULAR, PLAN_ANGULAR)
+        demand = 2.0 * np.abs(out[0, :]) + ROBOT_BASE_LENGTH * np.abs(out[1, :])
+        budget = 2.0 * HW_MAX_LINEAR * 0.999
+        over = demand > budget
+        if np.any(over):
+            out[:, over] *= budget / demand[over]
+        return out
+
+    def chain(dxi, x):
+        dxi = si_barrier(dxi, x)
+        dxu = si_to_uni(dxi, x)
+        stopped = np.linalg.norm(dxi, axis=0) < 1e-4
+        if np.any(stopped):
+            dxu[:, stopped] = 0.0
+        return wheel_safe(dxu)
+
+    return chain
+
+
+@pytest.mark.parametrize("n", [1, 20, 200])
+def test_safety_pipeline_matches_script_chain(n):
+    rng = np.random.default_rng(n)
+    chain = script_chain()
+    pipeline = create_safety_pipeline(
+        SAFETY_RADIUS, PLAN_LINEAR, PLAN_ANGULAR, ROBOT_BASE_LENGTH, HW_MAX_LINEAR
+    )
+    out = np.empty((2, n))
+    for step in range(50):
+        x = random_poses(n, rng)
+        dxi = rng.normal(0.0, 0.3, (2, n))
+        dxi[:, rng.random(n) < 0.2] = 0.0  # stopped robots
+        dxi[:, rng.random(n) < 0.1] *= 1e-5  # just under the stop threshold
+        expected = chain(dxi.copy(), x)
+        assert np.array_equal(pipeline(dxi.copy(), x, out=out if step % 2 else None), expected)
+    assert pipeline.timer.calls == 50
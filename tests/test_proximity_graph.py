@@ -0,0 +1,83 @@
+"""ProximityGraph against a dense distance test over a moving swarm."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from rps.utilities.misc import ProximityGraph
+
+RADIUS = 0.4
+
+
+def dense_adjacency(xy, radius):
+    diff = xy[:, :, None] - xy[:, None, :]
+    A = np.linalg.norm(diff, axis=0) < radius
+    np.fill_diagonal(A, False)
+    return A
+
+
+def edge_set(i, j):
+    return set(zip(i.tolist(), j.tolist()))
+
+
+@pytest.mark.parametrize("skin", [0.0, 0.1])
+def test_tracks_the_dense_graph_and_its_events(skin):
+    rng = np.random.default_rng(0)
+    n = 40
+    xy = np.vstack((rng.uniform(-1.5, 1.5, n), rng.uniform(-0.9, 0.9, n)))
+    velocity = rng.normal(0.0, 0.3, (2, n))
+    graph = ProximityGraph(RADIUS, skin=skin)
+    previous = set()
+    added_total = removed_total = 0
+    for _ in range(60):
+        added, removed = graph.update(xy)
+        A = dense_adjacency(xy, RADIUS)
+        expected = edge_set(*np.nonzero(np.triu(A)))
+        assert edge_set(graph.i, graph.j) == expected
+        assert np.all(graph.i < graph.j)
+        assert graph.edge_count == len(expected)
+        assert np.array_equal(graph.degree, A.sum(axis=1))
+        assert edge_set(*added) == expected - previous
+        assert edge_set(*removed) == previous - expected
+        added_total += len(expected - previous)
+        removed_total += len(previous - expected)
+
+        L = np.diag(A.sum(axis=1)) - A
+        values = rng.normal(size=n)
+        stacked = rng.normal(size=(3, n))
+        assert np.allclose(graph.laplacian_dot(values), L @ values)
+        assert np.allclose(graph.laplacian_dot(stacked), stacked @ L)
+        assert np.array_equal(graph.laplacian().toarray(), L)
+        for agent in (0, n // 2, n - 1):
+            assert np.array_equal(graph.neighbors(agent), np.nonzero(A[agent])[0])
+
+        previous = expected
+        xy = xy + 0.033 * velocity
+        bounce = np.abs(xy) > np.array([[1.5], [0.9]])
+        velocity[bounce] *= -1.0
+
+    report = graph.report()
+    assert report["updates"] == 60
+    assert report["added"] == added_total
+    assert report["removed"] == removed_total
+    if skin:
+        assert report["rebuilds"] < 60
+
+
+def test_size_change_and_reset_report_every_edge():
+    graph = ProximityGraph(RADIUS)
+    xy = np.array([[0.0, 0.3, 1.0], [0.0, 0.0, 0.0]])
+    graph.update(xy)
+    assert edge_set(graph.i, graph.j) == {(0, 1)}
+
+    # A new robot renumbers the keys: all old edges go, all new ones come.
+    added, removed = graph.update(np.hstack((xy, [[1.2], [0.0]])))
+    assert edge_set(*removed) == {(0, 1)}
+    assert edge_set(*added) == {(0, 1), (2, 3)}
+
+    graph.reset()
+    added, removed = graph.update(xy)
+    assert edge_set(*added) == {(0, 1)}
+    assert removed[0].size == 0
+    assert graph.report()["updates"] == 1